@@ -10,12 +10,23 @@ from extensions import init_extensions
 app = Flask(__name__)
 app.config.from_object(Config)
 
+# <objectid:...> route parameters - must be registered before the blueprints
+from services.validation import ObjectIdConverter, InvalidIdError
+app.url_map.converters['objectid'] = ObjectIdConverter
+
 # Enable CORS for frontend communication
-CORS(app)
+# X-Causal-Token must be readable by the frontend for read-your-own-writes routing
+CORS(app, expose_headers=['X-Causal-Token'])
 
 # Initialize extensions
 init_extensions(app)
 
+# Resolve the canteen (tenant) of every request before it reaches a blueprint
+from services.tenancy import resolve_canteen
+from services.read_routing import attach_causal_token
+app.before_request(resolve_canteen)
+app.after_request(attach_causal_token)
+
 # Home route
 @app.route('/')
 def home():
@@ -30,19 +41,40 @@ def home():
 def not_found(error):
     return jsonify({"error": "Route not found"}), 404
 
+@app.errorhandler(InvalidIdError)
+def invalid_id(error):
+    return jsonify({"error": "Invalid id", "detail": error.description}), 400
+
+@app.errorhandler(413)
+def request_too_large(error):
+    return jsonify({"error": f"Request body too large (limit {app.config['MAX_CONTENT_LENGTH']} bytes)"}), 413
+
 @app.errorhandler(500)
 def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
 
 # Import and register blueprints after app is fully initialized
+# Blueprint modules keep heavy dependencies (qrcode/PIL, bcrypt, pyarrow) out of
+# their top-level imports, so registering them all at start-up stays cheap
 def register_blueprints():
-    from routes import auth_routes, menu_routes, order_routes, payment_routes, qr_routes
+    if app.blueprints:
+        return
+    from routes import auth_routes, menu_routes, order_routes, payment_routes, qr_routes, export_routes, analytics_routes, receipt_routes, dashboard_routes
     app.register_blueprint(auth_routes.bp)
     app.register_blueprint(menu_routes.bp)
     app.register_blueprint(order_routes.bp)
     app.register_blueprint(payment_routes.bp)
     app.register_blueprint(qr_routes.bp)
+    app.register_blueprint(export_routes.bp)
+    app.register_blueprint(analytics_routes.bp)
+    app.register_blueprint(receipt_routes.bp)
+    app.register_blueprint(dashboard_routes.bp)
+
+# Registered at import time so WSGI servers (gunicorn app:app) serve every route
+register_blueprints()
 
 if __name__ == '__main__':
-    register_blueprints()
+    from extensions import db
+    from services.indexes import ensure_indexes
+    ensure_indexes(db)
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,71 @@
+# Import Time Budget Check
+# Imports the app in a fresh interpreter with -X importtime and fails when start-up
+# goes over IMPORT_TIME_BUDGET_MS or eagerly imports a lazily-loaded dependency
+#
+# Run from the backend directory:
+#   python -m benchmarks.import_budget
+#   python -m benchmarks.import_budget --budget-ms 300 --top 15
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Only needed by a few routes, so they must not be imported at start-up
+LAZY_MODULES = ['qrcode', 'PIL', 'bcrypt', 'flask_bcrypt', 'pyarrow']
+
+
+def _import_profile(runs):
+    """
+    Import the app `runs` times in fresh interpreters
+    Returns the fastest run as {module: (self_us, cumulative_us)}
+    """
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    best = None
+    for _ in range(runs):
+        stderr = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import app'],
+            cwd=backend_dir, check=True, capture_output=True, text=True
+        ).stderr
+
+        profile = {}
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, module = line[len('import time:'):].split('|')
+            profile.setdefault(module.strip(), (int(self_us), int(cumulative_us)))
+        if 'app' not in profile:
+            raise SystemExit(f"Could not import app:\n{stderr}")
+        if best is None or profile['app'][1] < best['app'][1]:
+            best = profile
+    return best
+
+
+def main():
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Check app import time against a budget")
+    parser.add_argument('--budget-ms', type=int, default=Config.IMPORT_TIME_BUDGET_MS)
+    parser.add_argument('--runs', type=int, default=3, help="take the fastest of this many runs")
+    parser.add_argument('--top', type=int, default=10, help="slowest top-level imports to list")
+    args = parser.parse_args()
+
+    profile = _import_profile(args.runs)
+    total_ms = profile['app'][1] / 1000
+
+    print(f"{'module':<40}{'cumulative ms':>15}")
+    slowest = sorted(profile.items(), key=lambda entry: entry[1][1], reverse=True)
+    for module, (_, cumulative_us) in slowest[:args.top]:
+        print(f"{module:<40}{cumulative_us / 1000:>15.1f}")
+
+    eager = [name for name in LAZY_MODULES if name in profile]
+    ok = total_ms <= args.budget_ms and not eager
+    print(f"App import: {total_ms:.1f} ms (budget {args.budget_ms} ms)")
+    if eager:
+        print(f"Imported at start-up but should be lazy: {', '.join(eager)}")
+    print("OK - within budget" if ok else "FAILED - start-up import budget exceeded")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
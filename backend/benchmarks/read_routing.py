@@ -0,0 +1,119 @@
+# Read Routing Benchmark
+# Measures how many read operations reach the primary with and without routing
+# stale-tolerant reads to secondaries
+#
+# Requires a replica set, e.g. three local nodes:
+#   mongod --replSet rs0 --port 27017 --dbpath data/rs0-0
+#   mongod --replSet rs0 --port 27018 --dbpath data/rs0-1
+#   mongod --replSet rs0 --port 27019 --dbpath data/rs0-2
+#   mongosh --eval 'rs.initiate({_id: "rs0", members: [
+#       {_id: 0, host: "localhost:27017"}, {_id: 1, host: "localhost:27018"},
+#       {_id: 2, host: "localhost:27019"}]})'
+#
+# Run from the backend directory:
+#   python -m benchmarks.read_routing --mongo-uri "mongodb://localhost:27017,localhost:27018,localhost:27019/canteen_db?replicaSet=rs0"
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from pymongo import MongoClient
+
+
+def _primary_opcounters(mongo_uri):
+    client = MongoClient(mongo_uri)
+    host, port = client.primary
+    client.close()
+
+    primary = MongoClient(host, port, directConnection=True)
+    try:
+        counters = primary.admin.command('serverStatus')['opcounters']
+    finally:
+        primary.close()
+    return counters['query'] + counters['getmore'] + counters['command']
+
+
+def run_workload(mongo_uri, requests, seed):
+    """Replay a menu-heavy read mix through the Flask test client"""
+    from app import app, register_blueprints
+    from flask_jwt_extended import create_access_token
+
+    register_blueprints()
+    client = app.test_client()
+    with app.app_context():
+        token = create_access_token(identity='benchmark-user')
+    headers = {"Authorization": f"Bearer {token}"}
+
+    items = client.get('/api/menu/items').get_json()['items']
+    if not items:
+        raise SystemExit("No menu items found - run seed_data.py or generate_data.py first")
+
+    # One write so that the order reads below are read-your-own-writes reads
+    response = client.post('/api/orders/', headers=headers, json={
+        "items": [{"item_id": items[0]['_id'], "quantity": 1}]
+    })
+    causal_token = response.headers.get('X-Causal-Token')
+    if causal_token:
+        headers['X-Causal-Token'] = causal_token
+
+    rng = random.Random(seed)
+    before = _primary_opcounters(mongo_uri)
+    started = time.perf_counter()
+    for _ in range(requests):
+        roll = rng.random()
+        if roll < 0.6:
+            client.get('/api/menu/items')
+        elif roll < 0.7:
+            client.get('/api/menu/categories')
+        elif roll < 0.8:
+            client.get(f"/api/menu/items/{rng.choice(items)['_id']}")
+        else:
+            client.get('/api/orders/', headers=headers)
+    elapsed = time.perf_counter() - started
+    after = _primary_opcounters(mongo_uri)
+
+    return {"primary_ops": after - before, "seconds": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Primary load with and without read routing")
+    parser.add_argument('--mongo-uri', default=os.environ.get('MONGO_URI'))
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not args.mongo_uri:
+        parser.error("--mongo-uri (a replica set URI) is required")
+
+    if args.worker:
+        print(json.dumps(run_workload(args.mongo_uri, args.requests, args.seed)))
+        return
+
+    results = {}
+    for routing in ('false', 'true'):
+        # Config is read at import time, so each mode runs in a fresh process.
+        # The menu cache is disabled to measure the database reads themselves.
+        env = dict(os.environ, MONGO_URI=args.mongo_uri, READ_FROM_SECONDARIES=routing, MENU_CACHE_TTL='0')
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.read_routing', '--worker',
+             '--requests', str(args.requests), '--seed', str(args.seed)],
+            env=env, check=True, capture_output=True, text=True
+        ).stdout
+        results[routing] = json.loads(output.strip().splitlines()[-1])
+
+    baseline, routed = results['false'], results['true']
+    print(f"{'mode':<22}{'primary ops':>12}{'seconds':>10}")
+    print(f"{'primary only':<22}{baseline['primary_ops']:>12}{baseline['seconds']:>10.2f}")
+    print(f"{'secondary routing':<22}{routed['primary_ops']:>12}{routed['seconds']:>10.2f}")
+    if baseline['primary_ops']:
+        reduction = 1 - routed['primary_ops'] / baseline['primary_ops']
+        print(f"Primary load reduction: {reduction:.0%}")
+
+
+if __name__ == '__main__':
+    main()
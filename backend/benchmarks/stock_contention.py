@@ -0,0 +1,75 @@
+# Stock Contention Check
+# Fires many concurrent orders at one stock-tracked item and verifies that it
+# is never oversold
+#
+# Run from the backend directory (uses the configured MONGO_URI):
+#   python -m benchmarks.stock_contention --stock 10 --orders 300 --threads 50
+
+import argparse
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent orders against limited stock")
+    parser.add_argument('--stock', type=int, default=10)
+    parser.add_argument('--orders', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=50)
+    args = parser.parse_args()
+
+    from app import app, register_blueprints
+    from config import Config
+    from extensions import db
+    from flask_jwt_extended import create_access_token
+    from services.menu import invalidate_menu
+    from services.stock import invalidate_stock
+
+    register_blueprints()
+    canteen_id = Config.DEFAULT_CANTEEN_ID
+    item = db.menu_items.find_one({"canteen_id": canteen_id, "is_available": True})
+    if item is None:
+        sys.exit("No available menu item found - run seed_data.py or generate_data.py first")
+
+    original = {"stock": item.get('stock'), "is_available": True, "sold_out": item.get('sold_out', False)}
+    db.menu_items.update_one({"_id": item['_id']}, {"$set": {"stock": args.stock, "sold_out": False}})
+    invalidate_menu(canteen_id)
+    invalidate_stock(canteen_id)
+
+    with app.app_context():
+        token = create_access_token(identity='contention-user')
+    headers = {"Authorization": f"Bearer {token}"}
+    body = {"items": [{"item_id": str(item['_id']), "quantity": 1}]}
+
+    def place_order(_):
+        return app.test_client().post('/api/orders/', headers=headers, json=body).status_code
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            statuses = Counter(executor.map(place_order, range(args.orders)))
+        elapsed = time.perf_counter() - started
+
+        final = db.menu_items.find_one({"_id": item['_id']})
+        print(f"{args.orders} orders in {elapsed:.2f}s ({args.orders / elapsed:,.0f} orders/s)")
+        print(f"Responses: {dict(statuses)}")
+        print(f"Final stock: {final['stock']}, available: {final['is_available']}")
+
+        expected = min(args.stock, args.orders)
+        ok = (
+            statuses[201] == expected
+            and final['stock'] == args.stock - expected
+            and final['is_available'] == (final['stock'] > 0)
+        )
+        print("OK - no overselling" if ok else "FAILED - stock and accepted orders do not match")
+        return 0 if ok else 1
+    finally:
+        db.orders.delete_many({"user_id": 'contention-user'})
+        db.menu_items.update_one({"_id": item['_id']}, {"$set": original})
+        invalidate_menu(canteen_id)
+        invalidate_stock(canteen_id)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,6 +8,22 @@ class Config:
     # MongoDB Configuration
     MONGO_URI = os.environ.get('MONGO_URI') or 'mongodb://localhost:27017/canteen_db'
     
+    # Read Routing Configuration
+    # Routes that tolerate stale data read from secondaries (needs a replica set)
+    READ_FROM_SECONDARIES = (os.environ.get('READ_FROM_SECONDARIES') or 'false').lower() == 'true'
+    READ_MAX_STALENESS_SECONDS = int(os.environ.get('READ_MAX_STALENESS_SECONDS') or 90)  # MongoDB minimum is 90
+    
+    # Export Configuration (orders per cursor batch / output chunk)
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE') or 5000)
+    EXPORT_MAX_BATCH_SIZE = 50000
+    
+    # Delta Sync Configuration
+    # Order watermarks stay this far behind now, so late-committing writes are not skipped
+    SYNC_WATERMARK_LAG_SECONDS = int(os.environ.get('SYNC_WATERMARK_LAG_SECONDS') or 10)
+    
+    # Analytics Configuration
+    STAGE_STATS_RETENTION_DAYS = int(os.environ.get('STAGE_STATS_RETENTION_DAYS') or 90)
+    
     # JWT Configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'your-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
@@ -16,10 +32,44 @@ class Config:
     UPI_ID = os.environ.get('UPI_ID') or 'chandrupalanisamyaids@okaxis'
     UPI_NAME = os.environ.get('UPI_NAME') or 'Chandru P'
     
+    # Multi-canteen Configuration
+    # Requests pick a canteen with the X-Canteen-ID header or ?canteen= parameter
+    DEFAULT_CANTEEN_ID = os.environ.get('DEFAULT_CANTEEN_ID') or 'main'
+    QR_BASE_URL = os.environ.get('QR_BASE_URL') or 'http://localhost:3000'
+    
+    # Cache Configuration (seconds)
+    MENU_CACHE_TTL = int(os.environ.get('MENU_CACHE_TTL') or 30)
+    CANTEEN_CACHE_TTL = int(os.environ.get('CANTEEN_CACHE_TTL') or 300)
+    STOCK_CACHE_TTL = int(os.environ.get('STOCK_CACHE_TTL') or 2)
+    POPULARITY_CACHE_TTL = int(os.environ.get('POPULARITY_CACHE_TTL') or 60)
+    
+    # Receipt Configuration
+    # Receipts are cached per order version, so the TTL only bounds memory use
+    RECEIPT_CACHE_TTL = int(os.environ.get('RECEIPT_CACHE_TTL') or 3600)
+    RECEIPT_CACHE_SIZE = int(os.environ.get('RECEIPT_CACHE_SIZE') or 2048)
+    RECEIPT_PRINTER_WIDTH = int(os.environ.get('RECEIPT_PRINTER_WIDTH') or 32)  # characters per line
+    RECEIPT_WORKERS = int(os.environ.get('RECEIPT_WORKERS') or 0)  # render_receipts.py processes, 0 = one per CPU
+    
     # Staff Credentials (hardcoded as per requirements)
     STAFF_USERNAME = 'admin123'
     STAFF_PASSWORD = '1234'
     
+    # Staff Dashboard
+    DASHBOARD_WORKERS = int(os.environ.get('DASHBOARD_WORKERS') or 4)  # threads for the bootstrap queries
+    DASHBOARD_MAX_ORDERS = int(os.environ.get('DASHBOARD_MAX_ORDERS') or 200)  # active orders returned
+    
+    # Start-up Budget
+    # Import time of the app module checked by benchmarks/import_budget.py
+    IMPORT_TIME_BUDGET_MS = int(os.environ.get('IMPORT_TIME_BUDGET_MS') or 500)
+    
+    # Billing
+    # Tax added to the menu prices of every order (the bill and receipts show the same rate)
+    TAX_RATE = float(os.environ.get('TAX_RATE') or 0.05)
+    
+    # Request Limits
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH') or 64 * 1024)  # bytes
+    MAX_ORDER_LINES = int(os.environ.get('MAX_ORDER_LINES') or 50)
+    
     # Other configurations
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'
     DEBUG = True
@@ -0,0 +1,56 @@
+# Order Export CLI
+# Streams orders for a date range to a file for accounting
+
+import argparse
+import sys
+
+from pymongo import MongoClient
+from pymongo.read_preferences import SecondaryPreferred
+
+from config import Config
+from services.export import EXPORT_FORMATS, ExportError, parse_date_range, iter_order_rows, stream_export
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export orders as CSV, NDJSON or Parquet")
+    parser.add_argument('--mongo-uri', default=Config.MONGO_URI)
+    parser.add_argument('--canteen', default=Config.DEFAULT_CANTEEN_ID)
+    parser.add_argument('--from', dest='start', required=True, help="First day (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='end', required=True, help="Last day, inclusive (YYYY-MM-DD)")
+    parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+    parser.add_argument('--batch-size', type=int, default=Config.EXPORT_BATCH_SIZE)
+    parser.add_argument('--output', default='-', help="Output file (default: stdout)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        start, end = parse_date_range(args.start, args.end)
+    except ExportError as e:
+        sys.exit(str(e))
+
+    client = MongoClient(args.mongo_uri)
+    try:
+        # Exports never need the latest writes - keep them off the primary when possible
+        database = client.get_database(
+            client.get_default_database().name,
+            read_preference=SecondaryPreferred()
+        )
+        menu = {str(item['_id']): item for item in database.menu_items.find({"canteen_id": args.canteen})}
+        rows = iter_order_rows(database, args.canteen, start, end, args.batch_size, menu)
+        output = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+        try:
+            for chunk in stream_export(rows, args.format, args.batch_size):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+    except ExportError as e:
+        sys.exit(str(e))
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
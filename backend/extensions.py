@@ -2,21 +2,51 @@
 # This module holds Flask extensions to avoid circular imports
 
 from flask_pymongo import PyMongo
-from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
+from pymongo.read_preferences import SecondaryPreferred
+
+
+class LazyBcrypt:
+    """
+    Flask-Bcrypt, imported and initialized on first use
+    Only the auth routes hash passwords, so workers that never serve them skip the import
+    """
+
+    def __init__(self):
+        self._app = None
+        self._bcrypt = None
+
+    def init_app(self, app):
+        self._app = app
+
+    def __getattr__(self, name):
+        if self._bcrypt is None:
+            from flask_bcrypt import Bcrypt
+            self._bcrypt = Bcrypt(self._app)
+        return getattr(self._bcrypt, name)
+
 
 # Initialize extensions without app
 mongo = PyMongo()
-bcrypt = Bcrypt()
+bcrypt = LazyBcrypt()
 jwt = JWTManager()
 
-# This will be set after app is created
+# These will be set after app is created
 db = None
+secondary_db = None  # Same database, reads routed to replica-set secondaries
 
 def init_extensions(app):
     """Initialize all extensions with the Flask app"""
-    global db
+    global db, secondary_db
     mongo.init_app(app)
     bcrypt.init_app(app)
     jwt.init_app(app)
     db = mongo.db
+    
+    if app.config['READ_FROM_SECONDARIES']:
+        secondary_db = mongo.cx.get_database(
+            db.name,
+            read_preference=SecondaryPreferred(max_staleness=app.config['READ_MAX_STALENESS_SECONDS'])
+        )
+    else:
+        secondary_db = db
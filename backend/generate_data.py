@@ -0,0 +1,273 @@
+# Synthetic Data Generator
+# Populates the database with large, realistic datasets for benchmarking
+
+import argparse
+import math
+import random
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+import bcrypt as bcrypt_lib
+from bson import ObjectId
+from pymongo import MongoClient
+
+from config import Config
+from models.models import User, Canteen, MenuItem, Order
+from services.indexes import ensure_indexes
+from services.order_lines import to_paise, order_total
+
+# Kind markers baked into generated ObjectIds so that workers can derive
+# the ids of users and menu items without querying the database
+KIND_USER = 1
+KIND_MENU_ITEM = 2
+KIND_ORDER = 3
+
+CATEGORIES = {
+    "South Indian": (30, 120, ["Dosa", "Idli", "Vada", "Uttapam", "Pongal", "Upma"]),
+    "North Indian": (80, 220, ["Paneer Tikka", "Dal Makhani", "Chole", "Rajma", "Aloo Gobi", "Kadai Paneer"]),
+    "Main Course": (90, 250, ["Biryani", "Fried Rice", "Pulao", "Thali", "Noodles", "Meals"]),
+    "Snacks": (15, 80, ["Samosa", "Puff", "Bajji", "Pakora", "Cutlet", "Sandwich"]),
+    "Beverages": (10, 90, ["Tea", "Coffee", "Cold Coffee", "Lassi", "Juice", "Milkshake"]),
+    "Desserts": (30, 120, ["Gulab Jamun", "Ice Cream", "Payasam", "Kesari", "Rasmalai", "Halwa"]),
+}
+VARIANTS = ["Classic", "Masala", "Special", "Ghee", "Butter", "Spicy", "Mini", "Jumbo", "Veg", "Cheese"]
+
+# Relative order volume for each hour of the day (breakfast, lunch and evening snack peaks)
+HOURLY_WEIGHTS = [
+    0, 0, 0, 0, 0, 0, 1, 4,      # 00-07
+    9, 8, 4, 6, 14, 15, 9, 4,    # 08-15
+    7, 8, 5, 4, 3, 1, 0, 0,      # 16-23
+]
+
+
+def _object_id(kind, index, created_at):
+    """
+    Build a deterministic ObjectId for the given kind and sequence index
+    The timestamp part keeps natural _id ordering close to created_at
+    """
+    timestamp = int(created_at.timestamp())
+    return ObjectId(struct.pack('>IB', timestamp, kind) + index.to_bytes(7, 'big'))
+
+
+def _canteen_ids(count):
+    """The default canteen followed by canteen2, canteen3, ..."""
+    return [Config.DEFAULT_CANTEEN_ID] + [f"canteen{n}" for n in range(2, count + 1)]
+
+
+def _menu_item(seed, index, epoch, canteen_ids):
+    """Deterministically build the menu item with the given index"""
+    rng = random.Random(f"{seed}:menu:{index}")
+    category = rng.choice(sorted(CATEGORIES))
+    low, high, dishes = CATEGORIES[category]
+    name = f"{rng.choice(VARIANTS)} {rng.choice(dishes)} #{index}"
+
+    item = MenuItem.create(
+        name=name,
+        description=f"Freshly prepared {name.lower()}",
+        price=rng.randrange(low, high + 1, 5),
+        category=category,
+        image_url=f"https://picsum.photos/seed/menu{index}/500",
+        is_available=rng.random() > 0.05,
+        canteen_id=canteen_ids[index % len(canteen_ids)]
+    )
+    item['_id'] = _object_id(KIND_MENU_ITEM, index, epoch)
+    return item
+
+
+def _popularity_weights(count, skew):
+    """Zipf-like weights so that a few dishes account for most of the orders"""
+    return [1.0 / math.pow(rank + 1, skew) for rank in range(count)]
+
+
+def _generate_menu_chunk(args, start, count):
+    items = [_menu_item(args['seed'], i, args['epoch'], args['canteen_ids']) for i in range(start, start + count)]
+    return _insert_chunk(args, 'menu_items', items)
+
+
+def _generate_user_chunk(args, start, count):
+    rng = random.Random(f"{args['seed']}:users:{start}")
+    users = []
+    for i in range(start, start + count):
+        user = User.create(
+            name=f"User {i}",
+            email=f"user{i}@example.com",
+            phone=f"9{rng.randrange(10 ** 8, 10 ** 9)}",
+            password_hash=args['password_hash']
+        )
+        user['created_at'] = args['epoch'] - timedelta(seconds=rng.randrange(365 * 86400))
+        user['_id'] = _object_id(KIND_USER, i, args['epoch'])
+        users.append(user)
+    return _insert_chunk(args, 'users', users)
+
+
+def _generate_order_chunk(args, start, count):
+    rng = random.Random(f"{args['seed']}:orders:{start}")
+    canteen_ids = args['canteen_ids']
+    menu = [_menu_item(args['seed'], i, args['epoch'], canteen_ids) for i in range(args['menu_items'])]
+    # Shuffle once per seed so popularity is not tied to the item index
+    random.Random(f"{args['seed']}:popularity").shuffle(menu)
+    menus = {
+        canteen_id: [item for item in menu if item['canteen_id'] == canteen_id]
+        for canteen_id in canteen_ids
+    }
+    item_weights = {
+        canteen_id: _popularity_weights(len(items), args['skew'])
+        for canteen_id, items in menus.items()
+    }
+    # The first canteens are the busiest ones
+    canteen_weights = _popularity_weights(len(canteen_ids), 1.0)
+    table_weights = _popularity_weights(args['tables'], 0.6)
+    hours = list(range(24))
+
+    orders = []
+    for i in range(start, start + count):
+        canteen_id = rng.choices(canteen_ids, canteen_weights)[0]
+        day = args['end'] - timedelta(days=rng.randrange(args['days']) + 1)
+        created_at = day.replace(hour=rng.choices(hours, HOURLY_WEIGHTS)[0]) + timedelta(
+            seconds=rng.randrange(3600)
+        )
+
+        lines = {}
+        line_count = rng.choices([1, 2, 3, 4], [45, 30, 17, 8])[0]
+        for menu_item in rng.choices(menus[canteen_id], item_weights[canteen_id], k=line_count):
+            key = str(menu_item['_id'])
+            if key not in lines:
+                lines[key] = {"item_id": key, "quantity": 0, "price_paise": to_paise(menu_item['price'])}
+            lines[key]['quantity'] += rng.choices([1, 2, 3], [75, 20, 5])[0]
+        items = list(lines.values())
+        total_amount = order_total(items)
+
+        order = Order.create(
+            user_id=str(_object_id(KIND_USER, rng.randrange(args['users']), args['epoch'])),
+            items=items,
+            total_amount=total_amount,
+            table_number=str(rng.choices(range(1, args['tables'] + 1), table_weights)[0]),
+            split_count=rng.choices([1, 2, 3, 4], [80, 12, 5, 3])[0],
+            payment_status=rng.choices(['success', 'pending', 'failed'], [90, 7, 3])[0],
+            canteen_id=canteen_id
+        )
+        order['_id'] = _object_id(KIND_ORDER, i, created_at)
+        order['order_status'] = 'delivered'
+        order['created_at'] = created_at
+
+        # The kitchen slows down at peak hours
+        load = 1 + HOURLY_WEIGHTS[created_at.hour] / 10
+        at = created_at
+        order['status_history'] = [{"status": "placed", "at": at, "by": order['user_id']}]
+        for status, low, high in (('preparing', 30, 300), ('ready', 120, 900), ('delivered', 15, 240)):
+            at += timedelta(seconds=rng.uniform(low, high) * load)
+            order['status_history'].append({"status": status, "at": at, "by": 'staff_admin'})
+        order['updated_at'] = at
+        orders.append(order)
+    return _insert_chunk(args, 'orders', orders)
+
+
+def _insert_chunk(args, collection, documents):
+    # Each worker process opens its own client - MongoClient is not fork-safe
+    client = MongoClient(args['mongo_uri'])
+    try:
+        db = client.get_default_database()
+        db[collection].insert_many(documents, ordered=False)
+    finally:
+        client.close()
+    return len(documents)
+
+
+GENERATORS = {
+    'menu_items': _generate_menu_chunk,
+    'users': _generate_user_chunk,
+    'orders': _generate_order_chunk,
+}
+
+
+def generate(args, collection, total, workers, chunk_size):
+    """Generate `total` documents for a collection in parallel chunks"""
+    if total <= 0:
+        return
+    started = time.perf_counter()
+    inserted = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(GENERATORS[collection], args, start, min(chunk_size, total - start))
+            for start in range(0, total, chunk_size)
+        ]
+        for future in as_completed(futures):
+            inserted += future.result()
+            print(f"  {collection}: {inserted}/{total}", end='\r', flush=True)
+    elapsed = time.perf_counter() - started
+    print(f"  {collection}: inserted {inserted} documents in {elapsed:.1f}s "
+          f"({inserted / max(elapsed, 1e-9):,.0f} docs/s)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic canteen data for benchmarking")
+    parser.add_argument('--mongo-uri', default=Config.MONGO_URI)
+    parser.add_argument('--canteens', type=int, default=1)
+    parser.add_argument('--menu-items', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--orders', type=int, default=1000000)
+    parser.add_argument('--tables', type=int, default=40)
+    parser.add_argument('--days', type=int, default=90, help="Spread orders over this many days")
+    parser.add_argument('--end', default=None, help="Last day of generated orders (YYYY-MM-DD, default today)")
+    parser.add_argument('--skew', type=float, default=1.1, help="Zipf exponent for item popularity")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--password', default='password123',
+                        help="Password shared by all generated users")
+    parser.add_argument('--drop', action='store_true', help="Drop existing collections first")
+    return parser.parse_args()
+
+
+def main():
+    options = parse_args()
+    end = datetime.strptime(options.end, '%Y-%m-%d') if options.end else datetime.utcnow()
+    end = end.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+    client = MongoClient(options.mongo_uri)
+    db = client.get_default_database()
+    if options.drop:
+        for collection in GENERATORS:
+            db.drop_collection(collection)
+        print("Dropped existing collections.")
+
+    # Every canteen needs at least one menu item to receive orders
+    canteen_ids = _canteen_ids(max(1, min(options.canteens, options.menu_items)))
+    for canteen_id in canteen_ids:
+        canteen = Canteen.create(canteen_id=canteen_id, name=f"Canteen {canteen_id}")
+        db.canteens.replace_one({"_id": canteen_id}, canteen, upsert=True)
+
+    # Test-only hash: minimum bcrypt cost, computed once and shared by every user
+    password_hash = bcrypt_lib.hashpw(options.password.encode('utf-8'), bcrypt_lib.gensalt(rounds=4)).decode('utf-8')
+
+    args = {
+        'mongo_uri': options.mongo_uri,
+        'seed': options.seed,
+        'epoch': end - timedelta(days=options.days),
+        'end': end,
+        'canteen_ids': canteen_ids,
+        'days': options.days,
+        'menu_items': options.menu_items,
+        'users': options.users,
+        'tables': options.tables,
+        'skew': options.skew,
+        'password_hash': password_hash,
+    }
+
+    print(f"Generating data with seed {options.seed} using {options.workers} workers...")
+    generate(args, 'menu_items', options.menu_items, options.workers, options.chunk_size)
+    generate(args, 'users', options.users, options.workers, options.chunk_size)
+    if options.menu_items and options.users:
+        generate(args, 'orders', options.orders, options.workers, options.chunk_size)
+
+    # Indexes are built after loading - much faster than maintaining them during the inserts
+    print("Creating indexes...")
+    ensure_indexes(db)
+    client.close()
+    print(f"Done. All generated users can log in with password '{options.password}'.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+# Database Management
+# Creates indexes, registers canteens, sets up per-canteen partitioning and rebuilds derived data
+
+import argparse
+import json
+
+from bson import BSON
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import OperationFailure
+
+from config import Config
+from models.models import Canteen
+from services.indexes import ensure_indexes, shard_orders, assign_canteen_zone
+from services.order_lines import compact_legacy_lines, hydrate_lines
+from services.popularity import rebuild_popularity
+from services.stage_stats import rebuild_stage_stats
+
+
+def create_indexes(client, db, args):
+    ensure_indexes(db)
+    print("Indexes created.")
+
+
+def add_canteen(client, db, args):
+    canteen = Canteen.create(
+        canteen_id=args.canteen_id,
+        name=args.name,
+        upi_id=args.upi_id,
+        upi_name=args.upi_name,
+        qr_base_url=args.qr_base_url
+    )
+    db.canteens.replace_one({"_id": args.canteen_id}, canteen, upsert=True)
+    print(f"Canteen '{args.canteen_id}' saved.")
+
+
+def backfill_canteen(client, db, args):
+    """Assign data created before multi-canteen support to the default canteen"""
+    for collection in ('menu_items', 'orders'):
+        result = db[collection].update_many(
+            {"canteen_id": {"$exists": False}},
+            {"$set": {"canteen_id": args.canteen_id}}
+        )
+        print(f"{collection}: assigned {result.modified_count} documents to '{args.canteen_id}'.")
+
+
+def shard(client, db, args):
+    ensure_indexes(db)
+    shard_orders(client, db.name)
+    print(f"Sharded {db.name}.orders by canteen.")
+
+
+def zone(client, db, args):
+    assign_canteen_zone(client, db.name, args.canteen_id, args.zone, shard=args.shard)
+    print(f"Orders of canteen '{args.canteen_id}' pinned to zone '{args.zone}'.")
+
+
+def rebuild_popularity_counters(client, db, args):
+    """Recompute item popularity from the order history, e.g. after a bulk import"""
+    canteen_ids = [args.canteen_id] if args.canteen_id else db.orders.distinct('canteen_id')
+    for canteen_id in canteen_ids:
+        replayed = rebuild_popularity(db, canteen_id, batch_size=args.batch_size)
+        print(f"Canteen '{canteen_id}': replayed {replayed} orders.")
+
+
+def rebuild_stage_timing(client, db, args):
+    """Recompute the order stage timing buckets from order status histories"""
+    canteen_ids = [args.canteen_id] if args.canteen_id else db.orders.distinct('canteen_id')
+    for canteen_id in canteen_ids:
+        replayed = rebuild_stage_stats(db, canteen_id, batch_size=args.batch_size)
+        print(f"Canteen '{canteen_id}': replayed {replayed} orders.")
+
+
+def _collection_size(db, collection):
+    try:
+        stats = db.command('collStats', collection)
+    except OperationFailure:
+        return None
+    return stats['size'], stats['storageSize']
+
+
+def compact_orders(client, db, args):
+    """One-time migration of order lines to the compact {item_id, quantity, price_paise} form"""
+    before = _collection_size(db, 'orders')
+    menus = {}
+    sizes = {"document": [0, 0], "response": [0, 0]}
+    migrated = 0
+    batch = []
+
+    def flush():
+        if batch:
+            db.orders.bulk_write(batch, ordered=False)
+        return len(batch)
+
+    legacy = {"items": {"$elemMatch": {"price_paise": {"$exists": False}}}}
+    for order in db.orders.find(legacy).batch_size(args.batch_size):
+        canteen_id = order.get('canteen_id')
+        if canteen_id not in menus:
+            menus[canteen_id] = {str(item['_id']): item for item in db.menu_items.find({"canteen_id": canteen_id})}
+        menu = menus[canteen_id]
+        items = compact_legacy_lines(order['items'], menu)
+
+        sizes['document'][0] += len(BSON.encode(order))
+        sizes['response'][0] += len(json.dumps(order, default=str))
+        order['items'] = items
+        sizes['document'][1] += len(BSON.encode(order))
+        sizes['response'][1] += len(json.dumps(dict(order, items=hydrate_lines(items, menu)), default=str))
+
+        batch.append(UpdateOne({"_id": order['_id']}, {"$set": {"items": items}}))
+        if len(batch) >= args.batch_size:
+            migrated += flush()
+            batch = []
+            print(f"Migrated {migrated} orders...")
+    migrated += flush()
+
+    print(f"Migrated {migrated} orders.")
+    for name, (old, new) in sizes.items():
+        if old:
+            print(f"{name.capitalize()} bytes: {old:,} -> {new:,} ({1 - new / old:.0%} smaller)")
+    after = _collection_size(db, 'orders')
+    if before and after:
+        print(f"orders collection size: {before[0]:,} -> {after[0]:,} bytes, "
+              f"storage size: {before[1]:,} -> {after[1]:,} bytes (freed space is reused, run compact to return it)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Canteen database management")
+    parser.add_argument('--mongo-uri', default=Config.MONGO_URI)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('indexes', help="Create all indexes").set_defaults(handler=create_indexes)
+
+    command = commands.add_parser('add-canteen', help="Register or update a canteen")
+    command.add_argument('canteen_id')
+    command.add_argument('--name', required=True)
+    command.add_argument('--upi-id')
+    command.add_argument('--upi-name')
+    command.add_argument('--qr-base-url')
+    command.set_defaults(handler=add_canteen)
+
+    command = commands.add_parser('backfill-canteen', help="Assign existing data to a canteen")
+    command.add_argument('--canteen-id', default=Config.DEFAULT_CANTEEN_ID)
+    command.set_defaults(handler=backfill_canteen)
+
+    commands.add_parser('shard', help="Shard orders by canteen").set_defaults(handler=shard)
+
+    command = commands.add_parser('zone', help="Pin a canteen's orders to a shard zone")
+    command.add_argument('canteen_id')
+    command.add_argument('zone')
+    command.add_argument('--shard', help="Also add this shard to the zone")
+    command.set_defaults(handler=zone)
+
+    command = commands.add_parser('compact-orders', help="Migrate order lines to the compact format")
+    command.add_argument('--batch-size', type=int, default=1000)
+    command.set_defaults(handler=compact_orders)
+
+    command = commands.add_parser('rebuild-popularity', help="Recompute item popularity from order history")
+    command.add_argument('--canteen-id', help="Only this canteen (default: all)")
+    command.add_argument('--batch-size', type=int, default=5000)
+    command.set_defaults(handler=rebuild_popularity_counters)
+
+    command = commands.add_parser('rebuild-stage-stats', help="Recompute order stage timing from status histories")
+    command.add_argument('--canteen-id', help="Only this canteen (default: all)")
+    command.add_argument('--batch-size', type=int, default=5000)
+    command.set_defaults(handler=rebuild_stage_timing)
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    client = MongoClient(args.mongo_uri)
+    try:
+        args.handler(client, client.get_default_database(), args)
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,9 @@
 # MongoDB Models / Schemas
-# Defines data structures for User, MenuItem, and Order
+# Defines data structures for User, Canteen, MenuItem, and Order
 
 from datetime import datetime
 from bson import ObjectId
+from config import Config
 
 class User:
     """User model for customer registration"""
@@ -23,18 +24,37 @@ class User:
         """Basic email validation"""
         return '@' in email and '.' in email
 
+class Canteen:
+    """Canteen model - each canteen is a separate tenant with its own menu and orders"""
+    
+    @staticmethod
+    def create(canteen_id, name, upi_id=None, upi_name=None, qr_base_url=None):
+        return {
+            "_id": canteen_id,
+            "name": name,
+            "upi_id": upi_id,  # Falls back to Config.UPI_ID when empty
+            "upi_name": upi_name,
+            "qr_base_url": qr_base_url,
+            "created_at": datetime.utcnow()
+        }
+
 class MenuItem:
     """Menu Item model for food items"""
     
     @staticmethod
-    def create(name, description, price, category, image_url, is_available=True):
+    def create(name, description, price, category, image_url, is_available=True, canteen_id=Config.DEFAULT_CANTEEN_ID,
+               stock=None):
+        sold_out = stock is not None and int(stock) <= 0
         return {
+            "canteen_id": canteen_id,
             "name": name,
             "description": description,
             "price": float(price),
             "category": category,
             "image_url": image_url,
-            "is_available": is_available,
+            "is_available": is_available and not sold_out,
+            "stock": None if stock is None else int(stock),  # None = not stock-tracked
+            "sold_out": sold_out,  # Set when stock ran out; restocking makes the item available again
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
@@ -42,19 +62,26 @@ class MenuItem:
 class Order:
     """Order model for customer orders"""
     
+    ORDER_STATUSES = ('placed', 'preparing', 'ready', 'delivered')
+    
     @staticmethod
-    def create(user_id, items, total_amount, table_number=None, split_count=1, payment_status='pending'):
+    def create(user_id, items, total_amount, table_number=None, split_count=1, payment_status='pending',
+               canteen_id=Config.DEFAULT_CANTEEN_ID):
+        now = datetime.utcnow()
         return {
+            "canteen_id": canteen_id,
             "user_id": user_id,
-            "items": items,  # List of {item_id, name, price, quantity}
+            "items": items,  # List of {item_id, quantity, price_paise} - see services/order_lines.py
             "total_amount": float(total_amount),
             "per_person_amount": float(total_amount) / split_count if split_count > 1 else float(total_amount),
             "split_count": split_count,
             "table_number": table_number,
             "payment_status": payment_status,  # pending, success, failed
             "order_status": "placed",  # placed, preparing, ready, delivered
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "status_history": [{"status": "placed", "at": now, "by": user_id}],
+            "deleted_at": None,  # Set when staff remove the order (kept as a tombstone for delta sync)
+            "created_at": now,
+            "updated_at": now
         }
     
     @staticmethod
@@ -63,3 +90,20 @@ class Order:
             "payment_status": status,
             "updated_at": datetime.utcnow()
         }
+    
+    @staticmethod
+    def update_order_status(status, actor):
+        """Set the new status and append it to the timeline in the same update"""
+        now = datetime.utcnow()
+        return {
+            "$set": {"order_status": status, "updated_at": now},
+            "$push": {"status_history": {"status": status, "at": now, "by": actor}}
+        }
+    
+    @staticmethod
+    def mark_deleted():
+        now = datetime.utcnow()
+        return {
+            "deleted_at": now,
+            "updated_at": now
+        }
@@ -0,0 +1,107 @@
+# Request Schemas
+# Declarative request bodies for every blueprint, decoded and validated in one pass by msgspec
+
+from typing import Annotated, Literal, Optional, Union
+import msgspec
+from msgspec import Meta, UNSET, UnsetType
+from config import Config
+
+# Common field types
+ObjectIdStr = Annotated[str, Meta(pattern=r'^[0-9a-fA-F]{24}$')]
+ShortText = Annotated[str, Meta(min_length=1, max_length=200)]
+LongText = Annotated[str, Meta(max_length=2000)]
+Url = Annotated[str, Meta(max_length=2000)]
+Price = Annotated[float, Meta(ge=0)]
+Stock = Annotated[int, Meta(ge=0)]
+TableNumber = Union[Annotated[int, Meta(ge=0)], Annotated[str, Meta(max_length=20)]]
+
+
+# Auth
+
+class RegisterRequest(msgspec.Struct):
+    name: ShortText
+    email: Annotated[str, Meta(min_length=3, max_length=254)]
+    phone: Annotated[str, Meta(min_length=1, max_length=20)]
+    password: Annotated[str, Meta(min_length=1, max_length=128)]
+
+
+class LoginRequest(msgspec.Struct):
+    email: Annotated[str, Meta(max_length=254)]
+    password: Annotated[str, Meta(max_length=128)]
+
+
+class StaffLoginRequest(msgspec.Struct):
+    username: Annotated[str, Meta(max_length=64)]
+    password: Annotated[str, Meta(max_length=128)]
+
+
+# Menu
+
+class MenuItemCreateRequest(msgspec.Struct):
+    name: ShortText
+    description: LongText
+    price: Price
+    category: ShortText
+    image_url: Url
+    is_available: bool = True
+    stock: Optional[Stock] = None  # None = not stock-tracked
+
+
+class MenuItemUpdateRequest(msgspec.Struct):
+    # UNSET fields are left unchanged
+    name: Union[ShortText, UnsetType] = UNSET
+    description: Union[LongText, UnsetType] = UNSET
+    price: Union[Price, UnsetType] = UNSET
+    category: Union[ShortText, UnsetType] = UNSET
+    image_url: Union[Url, UnsetType] = UNSET
+    is_available: Union[bool, UnsetType] = UNSET
+    stock: Union[Stock, None, UnsetType] = UNSET
+
+
+# Orders
+
+class OrderLine(msgspec.Struct):
+    # Any other fields (name, price, ...) are ignored - they come from the menu
+    item_id: ObjectIdStr
+    quantity: Annotated[int, Meta(ge=1, le=100)]
+
+
+class OrderCreateRequest(msgspec.Struct):
+    items: Annotated[list[OrderLine], Meta(min_length=1, max_length=Config.MAX_ORDER_LINES)]
+    total_amount: Optional[Price] = None  # Client's estimate - the total is computed from menu prices
+    table_number: Optional[TableNumber] = None
+    split_count: Annotated[int, Meta(ge=1, le=50)] = 1
+
+
+class PaymentStatusRequest(msgspec.Struct):
+    payment_status: Literal['pending', 'success', 'failed']
+
+
+class OrderStatusRequest(msgspec.Struct):
+    order_status: Literal['placed', 'preparing', 'ready', 'delivered']
+
+
+# Payment
+
+class UpiLinkRequest(msgspec.Struct):
+    amount: Annotated[float, Meta(gt=0)]
+    order_id: Annotated[str, Meta(max_length=64)] = 'N/A'
+    customer_name: Annotated[str, Meta(max_length=200)] = 'Customer'
+
+
+class PaymentVerifyRequest(msgspec.Struct):
+    order_id: Annotated[str, Meta(max_length=64)]
+    transaction_id: Annotated[str, Meta(max_length=128)]
+
+
+# QR codes
+
+class QrCodeRequest(msgspec.Struct):
+    table_number: TableNumber
+    base_url: Optional[Url] = None
+
+
+class QrCodesRequest(msgspec.Struct):
+    table_numbers: Optional[Annotated[list[TableNumber], Meta(min_length=1, max_length=200)]] = None
+    table_count: Optional[Annotated[int, Meta(ge=1, le=200)]] = None
+    base_url: Optional[Url] = None
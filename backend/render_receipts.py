@@ -0,0 +1,63 @@
+# End-of-Day Receipts CLI
+# Renders one receipt per order of a day on a worker pool and writes them to a zip
+
+import argparse
+import sys
+
+from pymongo import MongoClient
+from pymongo.read_preferences import SecondaryPreferred
+
+from config import Config
+from services.receipts import (RECEIPT_FORMATS, ReceiptError, check_options, day_range,
+                              render_cached, batch_workers, build_archive)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render the receipts of one day into a zip file")
+    parser.add_argument('--mongo-uri', default=Config.MONGO_URI)
+    parser.add_argument('--canteen', default=Config.DEFAULT_CANTEEN_ID)
+    parser.add_argument('--date', help="Day to render (YYYY-MM-DD, default today)")
+    parser.add_argument('--format', choices=sorted(RECEIPT_FORMATS), default='pdf')
+    parser.add_argument('--width', type=int, default=Config.RECEIPT_PRINTER_WIDTH)
+    parser.add_argument('--workers', type=int, help="Worker processes (default: RECEIPT_WORKERS, 0 = one per CPU)")
+    parser.add_argument('--output', help="Zip file (default: receipts_<canteen>_<date>.zip)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        check_options(args.format, args.width)
+        start, end = day_range(args.date)
+    except ReceiptError as e:
+        sys.exit(str(e))
+
+    client = MongoClient(args.mongo_uri)
+    try:
+        # Past orders never need the latest writes - keep them off the primary when possible
+        database = client.get_database(
+            client.get_default_database().name,
+            read_preference=SecondaryPreferred()
+        )
+        orders = list(database.orders.find({
+            "canteen_id": args.canteen,
+            "created_at": {"$gte": start, "$lt": end},
+            "deleted_at": None
+        }).sort("created_at", 1))
+        canteen = database.canteens.find_one({"_id": args.canteen}) or {}
+        menu = {str(item['_id']): item for item in database.menu_items.find({"canteen_id": args.canteen})}
+    finally:
+        client.close()
+
+    bodies = render_cached(
+        [[order] for order in orders], {"name": canteen.get('name') or 'Canteen'}, menu,
+        args.format, args.width, workers=args.workers or batch_workers()
+    )
+    output = args.output or f"receipts_{args.canteen}_{start:%Y%m%d}.zip"
+    with open(output, 'wb') as archive:
+        archive.write(build_archive(orders, bodies, args.format))
+    print(f"Rendered {len(orders)} receipts to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# Analytics Routes
+# Kitchen performance statistics for staff
+
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt
+from models.models import Order
+from services.read_routing import reads, read_from, STALE_OK
+from services.stage_stats import stage_percentiles
+from services.tenancy import get_canteen_id
+
+bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
+
+MAX_WINDOW_MINUTES = 30 * 24 * 60
+
+@bp.route('/stages', methods=['GET'])
+@jwt_required()
+@reads(STALE_OK)
+def get_stage_durations():
+    """
+    Order Stage Duration Percentiles (Staff Only)
+    Query params: from (default placed), to (default ready), window (minutes, default 30),
+                  group_by (hour, item, category), percentiles (default 50,90,95)
+    Example: p95 placed -> ready over the last 30 minutes
+    """
+    try:
+        claims = get_jwt()
+        if claims.get('role') != 'staff':
+            return jsonify({"error": "Unauthorized - Staff only"}), 403
+        
+        from_status = request.args.get('from', 'placed')
+        to_status = request.args.get('to', 'ready')
+        if from_status not in Order.ORDER_STATUSES or to_status not in Order.ORDER_STATUSES:
+            return jsonify({"error": "Invalid status"}), 400
+        
+        try:
+            window = int(request.args.get('window', 30))
+        except ValueError:
+            window = None
+        if window is None or not 0 < window <= MAX_WINDOW_MINUTES:
+            return jsonify({"error": f"window must be between 1 and {MAX_WINDOW_MINUTES} minutes"}), 400
+        
+        group_by = request.args.get('group_by')
+        if group_by not in (None, 'hour', 'item', 'category'):
+            return jsonify({"error": "group_by must be hour, item or category"}), 400
+        
+        try:
+            percentiles = [float(p) for p in request.args.get('percentiles', '50,90,95').split(',')]
+        except ValueError:
+            return jsonify({"error": "Invalid percentiles"}), 400
+        if not all(0 < p <= 100 for p in percentiles):
+            return jsonify({"error": "Invalid percentiles"}), 400
+        
+        with read_from() as (reader, session):
+            groups = stage_percentiles(
+                reader, get_canteen_id(), from_status, to_status, window,
+                group_by=group_by, percentiles=percentiles
+            )
+        
+        return jsonify({
+            "success": True,
+            "from": from_status,
+            "to": to_status,
+            "window_minutes": window,
+            "group_by": group_by,
+            "groups": groups
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,45 +1,43 @@
 # Authentication Routes
 # Handles user registration, login, and staff login
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from extensions import db, bcrypt
 from models.models import User
 from config import Config
+from models.schemas import RegisterRequest, LoginRequest, StaffLoginRequest
+from services.tenancy import get_canteen_id
+from services.validation import validate_body
 
 bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 @bp.route('/register', methods=['POST'])
-def register():
+@validate_body(RegisterRequest)
+def register(body):
     """
     User Registration Endpoint
     Accepts: name, email, phone, password
     Returns: success message and JWT token
     """
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        if not all(k in data for k in ('name', 'email', 'phone', 'password')):
-            return jsonify({"error": "Missing required fields"}), 400
-        
         # Check if user already exists
-        existing_user = db.users.find_one({"email": data['email']})
+        existing_user = db.users.find_one({"email": body.email})
         if existing_user:
             return jsonify({"error": "Email already registered"}), 409
         
         # Validate email format
-        if not User.validate_email(data['email']):
+        if not User.validate_email(body.email):
             return jsonify({"error": "Invalid email format"}), 400
         
         # Hash password
-        password_hash = bcrypt.generate_password_hash(data['password']).decode('utf-8')
+        password_hash = bcrypt.generate_password_hash(body.password).decode('utf-8')
         
         # Create user
         user = User.create(
-            name=data['name'],
-            email=data['email'],
-            phone=data['phone'],
+            name=body.name,
+            email=body.email,
+            phone=body.phone,
             password_hash=password_hash
         )
         
@@ -54,8 +52,8 @@ def register():
             "token": access_token,
             "user": {
                 "id": str(result.inserted_id),
-                "name": data['name'],
-                "email": data['email']
+                "name": body.name,
+                "email": body.email
             }
         }), 201
         
@@ -63,26 +61,21 @@ def register():
         return jsonify({"error": str(e)}), 500
 
 @bp.route('/login', methods=['POST'])
-def login():
+@validate_body(LoginRequest)
+def login(body):
     """
     User Login Endpoint
     Accepts: email, password
     Returns: JWT token and user info
     """
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        if not all(k in data for k in ('email', 'password')):
-            return jsonify({"error": "Missing email or password"}), 400
-        
         # Find user
-        user = db.users.find_one({"email": data['email']})
+        user = db.users.find_one({"email": body.email})
         if not user:
             return jsonify({"error": "Invalid credentials"}), 401
         
         # Check password
-        if not bcrypt.check_password_hash(user['password'], data['password']):
+        if not bcrypt.check_password_hash(user['password'], body.password):
             return jsonify({"error": "Invalid credentials"}), 401
         
         # Generate JWT token
@@ -102,26 +95,23 @@ def login():
         return jsonify({"error": str(e)}), 500
 
 @bp.route('/staff-login', methods=['POST'])
-def staff_login():
+@validate_body(StaffLoginRequest)
+def staff_login(body):
     """
     Staff Login Endpoint
     Accepts: username, password
     Default credentials: admin123 / 1234
-    Returns: JWT token with staff role
+    Returns: JWT token with staff role, scoped to the requested canteen
     """
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        if not all(k in data for k in ('username', 'password')):
-            return jsonify({"error": "Missing username or password"}), 400
-        
         # Check credentials
-        if data['username'] == Config.STAFF_USERNAME and data['password'] == Config.STAFF_PASSWORD:
+        if body.username == Config.STAFF_USERNAME and body.password == Config.STAFF_PASSWORD:
+            canteen_id = get_canteen_id()
+            
             # Generate JWT token with staff identifier
             access_token = create_access_token(
                 identity='staff_admin',
-                additional_claims={"role": "staff"}
+                additional_claims={"role": "staff", "canteen_id": canteen_id}
             )
             
             return jsonify({
@@ -129,7 +119,8 @@ def staff_login():
                 "token": access_token,
                 "staff": {
                     "username": Config.STAFF_USERNAME,
-                    "role": "admin"
+                    "role": "admin",
+                    "canteen_id": canteen_id
                 }
             }), 200
         else:
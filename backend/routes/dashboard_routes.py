@@ -0,0 +1,40 @@
+# Dashboard Routes
+# Single round-trip bootstrap of the staff dashboard
+
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt
+from services.dashboard import SECTIONS, bootstrap, parse_versions
+from services.read_routing import reads, read_target, CAUSAL
+from services.tenancy import get_canteen_id
+
+bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
+
+@bp.route('/bootstrap', methods=['GET'])
+@jwt_required()
+@reads(CAUSAL)
+def get_dashboard():
+    """
+    Staff Dashboard Bootstrap (Staff Only)
+    Returns: menu (all items), categories, orders (active queue), summary (today's counts)
+    and a version per section
+    Query params: versions=menu:<version>,orders:<version>,... from a previous response -
+                  sections whose version did not change are left out
+    """
+    try:
+        claims = get_jwt()
+        if claims.get('role') != 'staff':
+            return jsonify({"error": "Unauthorized - Staff only"}), 403
+        
+        # Must see the caller's own menu and order updates (read-your-own-writes)
+        reader, times = read_target()
+        versions, sections = bootstrap(get_canteen_id(), reader, times, parse_versions(request.args.get('versions')))
+        
+        return jsonify({
+            "success": True,
+            "versions": versions,
+            "unchanged": [section for section in SECTIONS if section not in sections],
+            **sections
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,55 @@
+# Export Routes
+# Streams orders for accounting as CSV, NDJSON or Parquet
+
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt
+from config import Config
+from services.menu import get_menu_item_map
+from services.export import EXPORT_FORMATS, ExportError, parse_date_range, iter_order_rows, stream_export
+from services.read_routing import reads, read_from, STALE_OK
+from services.tenancy import get_canteen_id
+
+bp = Blueprint('export', __name__, url_prefix='/api/export')
+
+@bp.route('/orders', methods=['GET'])
+@jwt_required()
+@reads(STALE_OK)
+def export_orders():
+    """
+    Export Orders (Staff Only)
+    Query params: from, to (ISO dates), format (csv, ndjson, parquet), batch_size
+    Returns: chunked download with one row per order line item
+    """
+    try:
+        claims = get_jwt()
+        if claims.get('role') != 'staff':
+            return jsonify({"error": "Unauthorized - Staff only"}), 403
+        
+        if not all(k in request.args for k in ('from', 'to')):
+            return jsonify({"error": "Missing from or to"}), 400
+        
+        start, end = parse_date_range(request.args['from'], request.args['to'])
+        export_format = request.args.get('format', 'csv')
+        batch_size = min(
+            max(request.args.get('batch_size', Config.EXPORT_BATCH_SIZE, type=int), 1),
+            Config.EXPORT_MAX_BATCH_SIZE
+        )
+        canteen_id = get_canteen_id()
+        
+        # Historical data - served from a secondary when read routing is enabled
+        with read_from() as (reader, session):
+            rows = iter_order_rows(reader, canteen_id, start, end, batch_size, get_menu_item_map(canteen_id))
+        chunks = stream_export(rows, export_format, batch_size)
+        
+        mimetype, extension = EXPORT_FORMATS[export_format]
+        filename = f"orders_{canteen_id}_{start:%Y%m%d}_{end:%Y%m%d}.{extension}"
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+        
+    except ExportError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -6,24 +6,40 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from bson import ObjectId
 from extensions import db
 from models.models import MenuItem
+from models.schemas import MenuItemCreateRequest, MenuItemUpdateRequest
+from services.menu import get_menu, invalidate_menu
+from services.popularity import WINDOWS, get_scores, rank_items
+from services.read_routing import reads, read_from, write_session, STALE_OK
+from services.stock import with_stock, invalidate_stock, sold_out_update
+from services.tenancy import get_canteen_id
+from services.validation import validate_body
 from datetime import datetime
+import msgspec
 
 bp = Blueprint('menu', __name__, url_prefix='/api/menu')
 
+MAX_POPULAR_ITEMS = 50
+
 @bp.route('/items', methods=['GET'])
+@reads(STALE_OK)
 def get_menu_items():
     """
     Get All Menu Items
     Public endpoint - no authentication required
-    Returns: List of all available menu items
+    Query params: sort=popular (most ordered in the last hour first), window (hour, day)
+    Returns: List of all available menu items of the current canteen
     """
     try:
-        # Fetch all menu items
-        items = list(db.menu_items.find({"is_available": True}))
+        canteen_id = get_canteen_id()
+        
+        # Served from the per-canteen menu cache, with live stock levels on top
+        items = [item for item in with_stock(get_menu(canteen_id), canteen_id) if item['is_available']]
         
-        # Convert ObjectId to string
-        for item in items:
-            item['_id'] = str(item['_id'])
+        if request.args.get('sort') == 'popular':
+            window = request.args.get('window', 'hour')
+            if window not in WINDOWS:
+                return jsonify({"error": f"window must be one of {', '.join(WINDOWS)}"}), 400
+            items = rank_items(items, canteen_id, window)
         
         return jsonify({
             "success": True,
@@ -33,13 +49,54 @@ def get_menu_items():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@bp.route('/items/<item_id>', methods=['GET'])
+@bp.route('/popular', methods=['GET'])
+@reads(STALE_OK)
+def get_popular_items():
+    """
+    Get Popular Items
+    Public endpoint - no authentication required
+    Query params: window (hour, day; default hour), limit (default 10)
+    Ranked from the precomputed order counters, so no orders are scanned
+    """
+    try:
+        window = request.args.get('window', 'hour')
+        if window not in WINDOWS:
+            return jsonify({"error": f"window must be one of {', '.join(WINDOWS)}"}), 400
+        limit = min(max(request.args.get('limit', 10, type=int), 1), MAX_POPULAR_ITEMS)
+        
+        canteen_id = get_canteen_id()
+        scores = get_scores(canteen_id)
+        items = [
+            item for item in with_stock(get_menu(canteen_id), canteen_id)
+            if item['is_available'] and round(scores.get(item['_id'], {}).get(window, 0), 2) > 0
+        ]
+        
+        popular = [
+            dict(item, popularity={key: round(value, 2) for key, value in scores[item['_id']].items()})
+            for item in rank_items(items, canteen_id, window)[:limit]
+        ]
+        
+        return jsonify({
+            "success": True,
+            "window": window,
+            "items": popular
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/items/<objectid:item_id>', methods=['GET'])
+@reads(STALE_OK)
 def get_menu_item(item_id):
     """
     Get Single Menu Item by ID
     """
     try:
-        item = db.menu_items.find_one({"_id": ObjectId(item_id)})
+        with read_from() as (reader, session):
+            item = reader.menu_items.find_one(
+                {"_id": ObjectId(item_id), "canteen_id": get_canteen_id()},
+                session=session
+            )
         
         if not item:
             return jsonify({"error": "Item not found"}), 404
@@ -56,7 +113,8 @@ def get_menu_item(item_id):
 
 @bp.route('/items', methods=['POST'])
 @jwt_required()
-def add_menu_item():
+@validate_body(MenuItemCreateRequest)
+def add_menu_item(body):
     """
     Add New Menu Item (Staff Only)
     Requires JWT token with staff role
@@ -67,25 +125,25 @@ def add_menu_item():
         if claims.get('role') != 'staff':
             return jsonify({"error": "Unauthorized - Staff only"}), 403
         
-        data = request.get_json()
-        
-        # Validate required fields
-        required_fields = ['name', 'description', 'price', 'category', 'image_url']
-        if not all(k in data for k in required_fields):
-            return jsonify({"error": "Missing required fields"}), 400
+        canteen_id = get_canteen_id()
         
         # Create menu item
         item = MenuItem.create(
-            name=data['name'],
-            description=data['description'],
-            price=data['price'],
-            category=data['category'],
-            image_url=data['image_url'],
-            is_available=data.get('is_available', True)
+            name=body.name,
+            description=body.description,
+            price=body.price,
+            category=body.category,
+            image_url=body.image_url,
+            is_available=body.is_available,
+            canteen_id=canteen_id,
+            stock=body.stock
         )
         
         # Insert into database
-        result = db.menu_items.insert_one(item)
+        with write_session() as session:
+            result = db.menu_items.insert_one(item, session=session)
+        invalidate_menu(canteen_id)
+        invalidate_stock(canteen_id)
         
         return jsonify({
             "message": "Menu item added successfully",
@@ -95,11 +153,14 @@ def add_menu_item():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@bp.route('/items/<item_id>', methods=['PUT'])
+@bp.route('/items/<objectid:item_id>', methods=['PUT'])
 @jwt_required()
-def update_menu_item(item_id):
+@validate_body(MenuItemUpdateRequest)
+def update_menu_item(item_id, body):
     """
     Update Menu Item (Staff Only)
+    Setting stock to zero hides the item; setting it above zero (or to null, which
+    stops tracking) makes an item that sold out available again
     """
     try:
         # Check if user is staff
@@ -107,27 +168,44 @@ def update_menu_item(item_id):
         if claims.get('role') != 'staff':
             return jsonify({"error": "Unauthorized - Staff only"}), 403
         
-        data = request.get_json()
-        
-        # Prepare update data
-        update_data = {}
-        allowed_fields = ['name', 'description', 'price', 'category', 'image_url', 'is_available']
-        
-        for field in allowed_fields:
-            if field in data:
-                update_data[field] = data[field]
+        # Prepare update data - only the fields present in the request
+        update_data = {
+            field: value
+            for field, value in msgspec.structs.asdict(body).items()
+            if value is not msgspec.UNSET
+        }
         
         update_data['updated_at'] = datetime.utcnow()
+        canteen_id = get_canteen_id()
+        
+        # One pipeline update: new values, then the same sold-out rule as order reservations
+        pipeline = [{"$set": {field: {"$literal": value} for field, value in update_data.items()}}]
+        if 'stock' in update_data and (update_data['stock'] is None or update_data['stock'] > 0):
+            # Restocking (or no longer tracking stock) makes an item that sold out available
+            # again, unless the request says otherwise
+            restock = {"sold_out": False}
+            if body.is_available is msgspec.UNSET:
+                restock['is_available'] = {"$cond": [{"$eq": ["$sold_out", True]}, True, "$is_available"]}
+            pipeline.append({"$set": restock})
+        pipeline.append(sold_out_update())
+        if body.is_available is False:
+            # Hidden by staff, not by selling out - giving stock back must not show it again
+            pipeline.append({"$set": {"sold_out": False}})
         
         # Update item
-        result = db.menu_items.update_one(
-            {"_id": ObjectId(item_id)},
-            {"$set": update_data}
-        )
+        with write_session() as session:
+            result = db.menu_items.update_one(
+                {"_id": ObjectId(item_id), "canteen_id": canteen_id},
+                pipeline,
+                session=session
+            )
         
         if result.matched_count == 0:
             return jsonify({"error": "Item not found"}), 404
         
+        invalidate_menu(canteen_id)
+        invalidate_stock(canteen_id)
+        
         return jsonify({
             "message": "Menu item updated successfully"
         }), 200
@@ -135,7 +213,7 @@ def update_menu_item(item_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@bp.route('/items/<item_id>', methods=['DELETE'])
+@bp.route('/items/<objectid:item_id>', methods=['DELETE'])
 @jwt_required()
 def delete_menu_item(item_id):
     """
@@ -148,15 +226,23 @@ def delete_menu_item(item_id):
         if claims.get('role') != 'staff':
             return jsonify({"error": "Unauthorized - Staff only"}), 403
         
-        # Soft delete - mark as unavailable
-        result = db.menu_items.update_one(
-            {"_id": ObjectId(item_id)},
-            {"$set": {"is_available": False, "updated_at": datetime.utcnow()}}
-        )
+        canteen_id = get_canteen_id()
+        
+        # Soft delete - mark as unavailable. Clearing sold_out keeps stock given back
+        # by removed orders from making the item available again.
+        with write_session() as session:
+            result = db.menu_items.update_one(
+                {"_id": ObjectId(item_id), "canteen_id": canteen_id},
+                {"$set": {"is_available": False, "sold_out": False, "updated_at": datetime.utcnow()}},
+                session=session
+            )
         
         if result.matched_count == 0:
             return jsonify({"error": "Item not found"}), 404
         
+        invalidate_menu(canteen_id)
+        invalidate_stock(canteen_id)
+        
         return jsonify({
             "message": "Menu item deleted successfully"
         }), 200
@@ -165,12 +251,14 @@ def delete_menu_item(item_id):
         return jsonify({"error": str(e)}), 500
 
 @bp.route('/categories', methods=['GET'])
+@reads(STALE_OK)
 def get_categories():
     """
     Get All Unique Categories
     """
     try:
-        categories = db.menu_items.distinct("category")
+        # Derived from the cached menu instead of a distinct() round trip
+        categories = sorted({item['category'] for item in get_menu(get_canteen_id())})
         return jsonify({
             "success": True,
             "categories": categories
@@ -1,47 +1,87 @@
 # Order Routes
 # Handles order creation and order management
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from bson import ObjectId
+from pymongo import ReturnDocument
 from extensions import db
+from config import Config
 from models.models import Order
-from datetime import datetime
+from models.schemas import OrderCreateRequest, PaymentStatusRequest, OrderStatusRequest
+from services.menu import get_menu_item_map
+from services.order_lines import compact_lines, order_total, hydrate_lines, line_quantities
+from services.popularity import record_order
+from services.stock import reserve_stock, release_stock, OutOfStockError
+from services.stage_stats import record_transition
+from services.tenancy import get_canteen_id
+from services.read_routing import reads, read_from, write_session, CAUSAL
+from services.validation import validate_body
+from datetime import datetime, timedelta, timezone
 
 bp = Blueprint('orders', __name__, url_prefix='/api/orders')
 
 @bp.route('/', methods=['POST'])
 @jwt_required()
-def create_order():
+@validate_body(OrderCreateRequest)
+def create_order(body):
     """
     Create New Order
     Requires JWT authentication
-    Accepts: items[], total_amount, table_number, split_count
+    Accepts: items[] (item_id, quantity), table_number, split_count
+    Prices come from the menu items on the primary, not the client; the total adds TAX_RATE.
+    The response carries the amount to charge.
+    Stock of every ordered item is reserved atomically; returns 409 if an item sold out
     """
     try:
         current_user = get_jwt_identity()
-        data = request.get_json()
+        canteen_id = get_canteen_id()
+        menu = get_menu_item_map(canteen_id)
         
-        # Validate required fields
-        if not all(k in data for k in ('items', 'total_amount')):
-            return jsonify({"error": "Missing required fields"}), 400
+        # Total quantity per menu item (the same item may appear on several lines)
+        quantities = {}
+        for line in body.items:
+            if line.item_id not in menu:
+                return jsonify({"error": "Unknown menu item", "item_id": line.item_id}), 400
+            quantities[line.item_id] = quantities.get(line.item_id, 0) + line.quantity
         
-        # Validate items array
-        if not isinstance(data['items'], list) or len(data['items']) == 0:
-            return jsonify({"error": "Items must be a non-empty array"}), 400
+        with write_session() as session:
+            # Reserve stock first so concurrent orders can never oversell.
+            # Prices come back from the reserved items, not from the menu cache.
+            try:
+                prices = reserve_stock(canteen_id, quantities, session=session)
+            except OutOfStockError as e:
+                return jsonify({"error": str(e), "item_id": e.item_id}), 409
+            
+            # Create order - compact lines, one per menu item - giving the stock back if that fails
+            try:
+                items = compact_lines(quantities, prices)
+                order = Order.create(
+                    user_id=current_user,
+                    items=items,
+                    total_amount=order_total(items),
+                    table_number=body.table_number,
+                    split_count=body.split_count,
+                    payment_status='pending',
+                    canteen_id=canteen_id
+                )
+                result = db.orders.insert_one(order, session=session)
+            except Exception:
+                release_stock(canteen_id, quantities, session=session)
+                raise
         
-        # Create order
-        order = Order.create(
-            user_id=current_user,
-            items=data['items'],
-            total_amount=data['total_amount'],
-            table_number=data.get('table_number'),
-            split_count=data.get('split_count', 1),
-            payment_status='pending'
-        )
+        # The client's total is only an estimate; a mismatch means it priced from a stale menu
+        if body.total_amount is not None and round(body.total_amount, 2) != order['total_amount']:
+            current_app.logger.warning(
+                "Order %s: client total %.2f differs from charged total %.2f",
+                result.inserted_id, body.total_amount, order['total_amount']
+            )
         
-        # Insert into database
-        result = db.orders.insert_one(order)
+        # Popularity counters must never fail the order itself
+        try:
+            record_order(canteen_id, quantities, order['created_at'])
+        except Exception:
+            current_app.logger.exception("Failed to update item popularity")
         
         return jsonify({
             "message": "Order created successfully",
@@ -59,40 +99,92 @@ def create_order():
 
 @bp.route('/', methods=['GET'])
 @jwt_required()
+@reads(CAUSAL)
 def get_orders():
     """
     Get Orders
     - If user: returns their orders
     - If staff: returns all orders
+    Must reflect the caller's own order and status updates (read-your-own-writes)
+    
+    Delta sync: pass ?since=<watermark> from a previous response to get only
+    orders created or changed after it, plus tombstones (ids) of removed orders.
+    Orders changed in the last SYNC_WATERMARK_LAG_SECONDS may be sent again.
+    Returns: orders, tombstones, watermark for the next poll
     """
     try:
         current_user = get_jwt_identity()
         claims = get_jwt()
+        canteen_id = get_canteen_id()
         
         # Check if staff
         if claims.get('role') == 'staff':
-            # Get all orders for staff
-            orders = list(db.orders.find().sort("created_at", -1))
+            # Get all orders of the canteen for staff
+            query = {"canteen_id": canteen_id}
         else:
             # Get user's orders only
-            orders = list(db.orders.find({"user_id": current_user}).sort("created_at", -1))
+            query = {"canteen_id": canteen_id, "user_id": current_user}
         
-        # Convert ObjectId to string and format dates
+        since = request.args.get('since')
+        if since:
+            try:
+                watermark = datetime.fromisoformat(since)
+            except ValueError:
+                return jsonify({"error": "Invalid since watermark"}), 400
+            # Stored timestamps are naive UTC
+            if watermark.tzinfo is not None:
+                watermark = watermark.astimezone(timezone.utc).replace(tzinfo=None)
+            # One seek on the (canteen_id, [user_id,] updated_at) index
+            query['updated_at'] = {"$gt": watermark}
+            sort = [("updated_at", 1)]
+        else:
+            watermark = None
+            query['deleted_at'] = None
+            sort = [("created_at", -1)]
+        
+        # updated_at is stamped before a write reaches the database, so a write
+        # stamped just before this read may still commit after it. The watermark
+        # never moves past now - lag; the overlap is sent again and clients
+        # replace orders by _id.
+        settled = datetime.utcnow() - timedelta(seconds=Config.SYNC_WATERMARK_LAG_SECONDS)
+        with read_from() as (reader, session):
+            orders = list(reader.orders.find(query, session=session).sort(sort))
+        
+        menu = get_menu_item_map(canteen_id)
+        tombstones = []
+        changed = []
+        latest = None
         for order in orders:
+            if latest is None or order['updated_at'] > latest:
+                latest = order['updated_at']
+            if order.get('deleted_at'):
+                tombstones.append(str(order['_id']))
+                continue
+            
+            # Convert ObjectId to string, format dates and fill in item names from the menu
             order['_id'] = str(order['_id'])
             order['created_at'] = order['created_at'].isoformat()
             order['updated_at'] = order['updated_at'].isoformat()
+            order['status_history'] = [dict(entry, at=entry['at'].isoformat()) for entry in order.get('status_history', [])]
+            order['items'] = hydrate_lines(order['items'], menu)
+            changed.append(order)
+        
+        if latest is not None:
+            watermark = min(latest, settled)
         
         return jsonify({
             "success": True,
-            "orders": orders
+            "orders": changed,
+            "tombstones": tombstones,
+            "watermark": watermark.isoformat() if watermark else None
         }), 200
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@bp.route('/<order_id>', methods=['GET'])
+@bp.route('/<objectid:order_id>', methods=['GET'])
 @jwt_required()
+@reads(CAUSAL)
 def get_order(order_id):
     """
     Get Single Order by ID
@@ -101,7 +193,11 @@ def get_order(order_id):
         current_user = get_jwt_identity()
         claims = get_jwt()
         
-        order = db.orders.find_one({"_id": ObjectId(order_id)})
+        with read_from() as (reader, session):
+            order = reader.orders.find_one(
+                {"_id": ObjectId(order_id), "canteen_id": get_canteen_id(), "deleted_at": None},
+                session=session
+            )
         
         if not order:
             return jsonify({"error": "Order not found"}), 404
@@ -113,6 +209,8 @@ def get_order(order_id):
         order['_id'] = str(order['_id'])
         order['created_at'] = order['created_at'].isoformat()
         order['updated_at'] = order['updated_at'].isoformat()
+        order['status_history'] = [dict(entry, at=entry['at'].isoformat()) for entry in order.get('status_history', [])]
+        order['items'] = hydrate_lines(order['items'], get_menu_item_map(order['canteen_id']))
         
         return jsonify({
             "success": True,
@@ -122,26 +220,24 @@ def get_order(order_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@bp.route('/<order_id>/payment', methods=['PUT'])
+@bp.route('/<objectid:order_id>/payment', methods=['PUT'])
 @jwt_required()
-def update_payment_status(order_id):
+@validate_body(PaymentStatusRequest)
+def update_payment_status(order_id, body):
     """
     Update Payment Status
     Accepts: payment_status (pending, success, failed)
     """
     try:
-        data = request.get_json()
-        
-        if 'payment_status' not in data:
-            return jsonify({"error": "Missing payment_status"}), 400
-        
         # Update payment status
-        update_data = Order.update_payment_status(order_id, data['payment_status'])
+        update_data = Order.update_payment_status(order_id, body.payment_status)
         
-        result = db.orders.update_one(
-            {"_id": ObjectId(order_id)},
-            {"$set": update_data}
-        )
+        with write_session() as session:
+            result = db.orders.update_one(
+                {"_id": ObjectId(order_id), "canteen_id": get_canteen_id(), "deleted_at": None},
+                {"$set": update_data},
+                session=session
+            )
         
         if result.matched_count == 0:
             return jsonify({"error": "Order not found"}), 404
@@ -153,38 +249,78 @@ def update_payment_status(order_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@bp.route('/<order_id>/status', methods=['PUT'])
+@bp.route('/<objectid:order_id>/status', methods=['PUT'])
 @jwt_required()
-def update_order_status(order_id):
+@validate_body(OrderStatusRequest)
+def update_order_status(order_id, body):
     """
     Update Order Status (Staff Only)
     Accepts: order_status (placed, preparing, ready, delivered)
+    Each change is appended to the order's status_history and feeds the stage timing stats
     """
     try:
         claims = get_jwt()
         if claims.get('role') != 'staff':
             return jsonify({"error": "Unauthorized - Staff only"}), 403
         
-        data = request.get_json()
-        
-        if 'order_status' not in data:
-            return jsonify({"error": "Missing order_status"}), 400
+        # Update order status and append to the timeline in one atomic update
+        update = Order.update_order_status(body.order_status, actor=get_jwt_identity())
+        with write_session() as session:
+            order = db.orders.find_one_and_update(
+                {"_id": ObjectId(order_id), "canteen_id": get_canteen_id(), "deleted_at": None},
+                update,
+                return_document=ReturnDocument.BEFORE,
+                session=session
+            )
         
-        # Update order status
-        result = db.orders.update_one(
-            {"_id": ObjectId(order_id)},
-            {"$set": {
-                "order_status": data['order_status'],
-                "updated_at": datetime.utcnow()
-            }}
-        )
-        
-        if result.matched_count == 0:
+        if not order:
             return jsonify({"error": "Order not found"}), 404
         
+        # Stats must never fail the status change itself
+        try:
+            record_transition(order, body.order_status, update['$set']['updated_at'])
+        except Exception:
+            current_app.logger.exception("Failed to record order stage timing")
+        
         return jsonify({
             "message": "Order status updated successfully"
         }), 200
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+@bp.route('/<objectid:order_id>', methods=['DELETE'])
+@jwt_required()
+def delete_order(order_id):
+    """
+    Remove Order (Staff Only)
+    Soft delete - the order stays as a tombstone so polling clients drop it
+    Stock of orders that were not delivered yet is given back
+    """
+    try:
+        claims = get_jwt()
+        if claims.get('role') != 'staff':
+            return jsonify({"error": "Unauthorized - Staff only"}), 403
+        
+        canteen_id = get_canteen_id()
+        
+        with write_session() as session:
+            order = db.orders.find_one_and_update(
+                {"_id": ObjectId(order_id), "canteen_id": canteen_id, "deleted_at": None},
+                {"$set": Order.mark_deleted()},
+                return_document=ReturnDocument.BEFORE,
+                session=session
+            )
+            
+            if not order:
+                return jsonify({"error": "Order not found"}), 404
+            
+            if order['order_status'] != 'delivered':
+                release_stock(canteen_id, line_quantities(order['items']), session=session)
+        
+        return jsonify({
+            "message": "Order removed successfully"
+        }), 200
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,16 +1,19 @@
 # Payment Routes
 # Generates UPI payment links
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, jsonify
 from flask_jwt_extended import jwt_required
-from config import Config
+from models.schemas import UpiLinkRequest, PaymentVerifyRequest
+from services.tenancy import get_canteen, get_canteen_id
+from services.validation import validate_body
 import urllib.parse
 
 bp = Blueprint('payment', __name__, url_prefix='/api/payment')
 
 @bp.route('/generate-upi', methods=['POST'])
 @jwt_required()
-def generate_upi_link():
+@validate_body(UpiLinkRequest)
+def generate_upi_link(body):
     """
     Generate UPI Payment Link
     Accepts: amount, order_id, customer_name
@@ -20,23 +23,20 @@ def generate_upi_link():
     upi://pay?pa=<UPI_ID>&pn=<NAME>&am=<AMOUNT>&cu=INR&tn=<TRANSACTION_NOTE>
     """
     try:
-        data = request.get_json()
+        amount = body.amount
+        order_id = body.order_id
+        customer_name = body.customer_name
         
-        # Validate required fields
-        if 'amount' not in data:
-            return jsonify({"error": "Amount is required"}), 400
-        
-        amount = float(data['amount'])
-        order_id = data.get('order_id', 'N/A')
-        customer_name = data.get('customer_name', 'Customer')
+        # Each canteen collects payments on its own UPI ID
+        canteen = get_canteen(get_canteen_id())
         
         # Transaction note
         transaction_note = f"Canteen Order {order_id}"
         
         # Build UPI link
         upi_params = {
-            'pa': Config.UPI_ID,  # Payee address (UPI ID)
-            'pn': Config.UPI_NAME,  # Payee name
+            'pa': canteen['upi_id'],  # Payee address (UPI ID)
+            'pn': canteen['upi_name'],  # Payee name
             'am': str(amount),  # Amount
             'cu': 'INR',  # Currency
             'tn': transaction_note  # Transaction note
@@ -50,8 +50,8 @@ def generate_upi_link():
             "success": True,
             "upi_link": upi_link,
             "amount": amount,
-            "upi_id": Config.UPI_ID,
-            "payee_name": Config.UPI_NAME,
+            "upi_id": canteen['upi_id'],
+            "payee_name": canteen['upi_name'],
             "message": "UPI link generated successfully"
         }), 200
         
@@ -60,25 +60,21 @@ def generate_upi_link():
 
 @bp.route('/verify', methods=['POST'])
 @jwt_required()
-def verify_payment():
+@validate_body(PaymentVerifyRequest)
+def verify_payment(body):
     """
     Payment Verification Endpoint
     In production, this would verify with payment gateway
     For demo, we'll accept transaction_id and mark as success
     """
     try:
-        data = request.get_json()
-        
-        if not all(k in data for k in ('order_id', 'transaction_id')):
-            return jsonify({"error": "Missing required fields"}), 400
-        
         # In production: Verify with UPI payment gateway
         # For demo: Just return success
         
         return jsonify({
             "success": True,
             "payment_verified": True,
-            "transaction_id": data['transaction_id'],
+            "transaction_id": body.transaction_id,
             "message": "Payment verified successfully"
         }), 200
         
@@ -1,52 +1,59 @@
 # QR Code Routes
 # Generates QR codes for tables
 
-from flask import Blueprint, request, jsonify, send_file
-import qrcode
+from flask import Blueprint, jsonify, send_file
 from io import BytesIO
 import base64
+from models.schemas import QrCodeRequest, QrCodesRequest
+from services.tenancy import get_canteen, get_canteen_id
+from services.validation import validate_body
 
 bp = Blueprint('qr', __name__, url_prefix='/api/qr')
 
+def _qr_image_base64(order_url):
+    """Render order_url as a PNG QR code, base64 encoded"""
+    # qrcode pulls in PIL, which is slow to import and only needed here,
+    # so it is imported on first use instead of at worker start-up
+    import qrcode
+    
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(order_url)
+    qr.make(fit=True)
+    
+    # Create image
+    img = qr.make_image(fill_color="black", back_color="white")
+    
+    # Convert to base64
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    buffer.seek(0)
+    return base64.b64encode(buffer.getvalue()).decode()
+
 @bp.route('/generate', methods=['POST'])
-def generate_qr_code():
+@validate_body(QrCodeRequest)
+def generate_qr_code(body):
     """
     Generate QR Code for Table
     Accepts: table_number, base_url (optional)
     Returns: QR code image as base64
     
-    QR Code contains URL: http://localhost:3000/order?table=<table_number>
+    QR Code contains URL: http://localhost:3000/order?table=<table_number>&canteen=<canteen_id>
     """
     try:
-        data = request.get_json()
-        
-        if 'table_number' not in data:
-            return jsonify({"error": "Table number is required"}), 400
-        
-        table_number = data['table_number']
-        base_url = data.get('base_url', 'http://localhost:3000')
+        table_number = body.table_number
+        canteen = get_canteen(get_canteen_id())
+        base_url = body.base_url or canteen['qr_base_url']
         
         # Create URL for QR code
-        order_url = f"{base_url}/order?table={table_number}"
+        order_url = f"{base_url}/order?table={table_number}&canteen={canteen['id']}"
         
         # Generate QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(order_url)
-        qr.make(fit=True)
-        
-        # Create image
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert to base64
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        img_base64 = base64.b64encode(buffer.getvalue()).decode()
+        img_base64 = _qr_image_base64(order_url)
         
         return jsonify({
             "success": True,
@@ -60,47 +67,33 @@ def generate_qr_code():
         return jsonify({"error": str(e)}), 500
 
 @bp.route('/generate-multiple', methods=['POST'])
-def generate_multiple_qr():
+@validate_body(QrCodesRequest)
+def generate_multiple_qr(body):
     """
     Generate Multiple QR Codes for Multiple Tables
     Accepts: table_count or table_numbers[]
     Returns: Array of QR codes
     """
     try:
-        data = request.get_json()
-        base_url = data.get('base_url', 'http://localhost:3000')
+        canteen = get_canteen(get_canteen_id())
+        base_url = body.base_url or canteen['qr_base_url']
         
         qr_codes = []
         
         # Generate for specific table numbers
-        if 'table_numbers' in data:
-            table_numbers = data['table_numbers']
+        if body.table_numbers is not None:
+            table_numbers = body.table_numbers
         # Or generate for count
-        elif 'table_count' in data:
-            table_count = int(data['table_count'])
+        elif body.table_count is not None:
+            table_count = body.table_count
             table_numbers = list(range(1, table_count + 1))
         else:
             return jsonify({"error": "Provide either table_numbers or table_count"}), 400
         
         # Generate QR for each table
         for table_num in table_numbers:
-            order_url = f"{base_url}/order?table={table_num}"
-            
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(order_url)
-            qr.make(fit=True)
-            
-            img = qr.make_image(fill_color="black", back_color="white")
-            
-            buffer = BytesIO()
-            img.save(buffer, format='PNG')
-            buffer.seek(0)
-            img_base64 = base64.b64encode(buffer.getvalue()).decode()
+            order_url = f"{base_url}/order?table={table_num}&canteen={canteen['id']}"
+            img_base64 = _qr_image_base64(order_url)
             
             qr_codes.append({
                 "table_number": table_num,
@@ -0,0 +1,170 @@
+# Receipt Routes
+# Server-rendered bills (HTML, PDF, thermal text) for orders, tables and end-of-day batches
+
+from flask import Blueprint, request, jsonify, Response
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from bson import ObjectId
+from config import Config
+from services.menu import get_menu_item_map
+from services.receipts import (RECEIPT_FORMATS, ReceiptError, receipt_cache, cache_key, check_options,
+                               day_range, render_cached, build_archive)
+from services.read_routing import reads, read_from, STALE_OK, CAUSAL
+from services.tenancy import get_canteen, get_canteen_id
+
+bp = Blueprint('receipts', __name__, url_prefix='/api/receipts')
+
+# Enough to look up a cached receipt without loading the whole order
+STAMP_FIELDS = {"updated_at": 1, "created_at": 1, "user_id": 1}
+
+def _receipt_options():
+    receipt_format = request.args.get('format', 'html')
+    width = request.args.get('width', Config.RECEIPT_PRINTER_WIDTH, type=int)
+    check_options(receipt_format, width)
+    return receipt_format, width
+
+def _receipt_response(body, receipt_format, filename):
+    mimetype, extension = RECEIPT_FORMATS[receipt_format]
+    return Response(body, mimetype=mimetype, headers={
+        "Content-Disposition": f"inline; filename={filename}.{extension}"
+    })
+
+def _cached_or_render(query, receipt_format, width, canteen_id, owner=None):
+    """
+    Receipt for all orders matching query (oldest first)
+    Only _id and updated_at are read unless the receipt has to be rendered
+    owner: when set, nothing is loaded or rendered unless every order belongs to this user
+    Returns (body, stamps) - body is None if no order matches (stamps empty) or
+    another user owns them (stamps not empty)
+    """
+    with read_from() as (reader, session):
+        stamps = list(reader.orders.find(query, STAMP_FIELDS, session=session).sort("created_at", 1))
+        if not stamps:
+            return None, stamps
+        if owner is not None and any(stamp['user_id'] != owner for stamp in stamps):
+            return None, stamps
+        body = receipt_cache.get(cache_key(stamps, receipt_format, width))
+        if body is not None:
+            return body, stamps
+        orders = list(reader.orders.find(query, session=session).sort("created_at", 1))
+
+    if not orders:
+        return None, []
+    body = render_cached([orders], get_canteen(canteen_id), get_menu_item_map(canteen_id), receipt_format, width)[0]
+    return body, stamps
+
+@bp.route('/orders/<objectid:order_id>', methods=['GET'])
+@jwt_required()
+@reads(CAUSAL)
+def get_order_receipt(order_id):
+    """
+    Get Order Receipt
+    Query params: format (html, pdf, text), width (characters per line, text and pdf)
+    Cached per order version - payment or status changes render a fresh receipt
+    """
+    try:
+        receipt_format, width = _receipt_options()
+        canteen_id = get_canteen_id()
+
+        # Check authorization before anything is loaded or rendered
+        # (user can only see their own receipts, staff can see all)
+        claims = get_jwt()
+        owner = None if claims.get('role') == 'staff' else get_jwt_identity()
+        body, stamps = _cached_or_render(
+            {"_id": ObjectId(order_id), "canteen_id": canteen_id, "deleted_at": None},
+            receipt_format, width, canteen_id, owner=owner
+        )
+        if body is None and stamps:
+            return jsonify({"error": "Unauthorized"}), 403
+        if body is None:
+            return jsonify({"error": "Order not found"}), 404
+
+        return _receipt_response(body, receipt_format, f"receipt_{order_id}")
+
+    except ReceiptError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/tables/<table_number>', methods=['GET'])
+@jwt_required()
+@reads(CAUSAL)
+def get_table_receipt(table_number):
+    """
+    Get Table Receipt (Staff Only)
+    Combined bill of every order placed at a table on one day
+    Query params: date (YYYY-MM-DD, default today), format, width
+    """
+    try:
+        claims = get_jwt()
+        if claims.get('role') != 'staff':
+            return jsonify({"error": "Unauthorized - Staff only"}), 403
+
+        receipt_format, width = _receipt_options()
+        start, end = day_range(request.args.get('date'))
+        canteen_id = get_canteen_id()
+
+        # Table numbers are stored as given by the client, number or string
+        tables = [table_number, int(table_number)] if table_number.isdigit() else [table_number]
+        body, _ = _cached_or_render(
+            {
+                "canteen_id": canteen_id,
+                "table_number": {"$in": tables},
+                "created_at": {"$gte": start, "$lt": end},
+                "deleted_at": None
+            },
+            receipt_format, width, canteen_id
+        )
+        if body is None:
+            return jsonify({"error": "No orders for this table"}), 404
+
+        return _receipt_response(body, receipt_format, f"table_{table_number}_{start:%Y%m%d}")
+
+    except ReceiptError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/daily', methods=['GET'])
+@jwt_required()
+@reads(STALE_OK)
+def get_daily_receipts():
+    """
+    End-of-Day Receipts (Staff Only)
+    Query params: date (YYYY-MM-DD, default today), format, width
+    Returns: zip with one receipt per order
+    """
+    try:
+        claims = get_jwt()
+        if claims.get('role') != 'staff':
+            return jsonify({"error": "Unauthorized - Staff only"}), 403
+
+        receipt_format, width = _receipt_options()
+        start, end = day_range(request.args.get('date'))
+        canteen_id = get_canteen_id()
+        query = {"canteen_id": canteen_id, "created_at": {"$gte": start, "$lt": end}, "deleted_at": None}
+
+        with read_from() as (reader, session):
+            stamps = list(reader.orders.find(query, STAMP_FIELDS, session=session).sort("created_at", 1))
+            bodies = {stamp['_id']: receipt_cache.get(cache_key([stamp], receipt_format, width)) for stamp in stamps}
+            # Only orders without a cached receipt are loaded in full
+            missing = [order_id for order_id, body in bodies.items() if body is None]
+            orders = list(reader.orders.find({"_id": {"$in": missing}}, session=session)) if missing else []
+
+        # Rendered in this worker: starting processes per request costs more than
+        # a day's misses. render_receipts.py renders large batches on a pool.
+        rendered = render_cached(
+            [[order] for order in orders], get_canteen(canteen_id), get_menu_item_map(canteen_id),
+            receipt_format, width
+        )
+        bodies.update((order['_id'], body) for order, body in zip(orders, rendered))
+
+        stamps = [stamp for stamp in stamps if bodies[stamp['_id']] is not None]
+        archive = build_archive(stamps, [bodies[stamp['_id']] for stamp in stamps], receipt_format)
+        return Response(archive, mimetype='application/zip', headers={
+            "Content-Disposition": f"attachment; filename=receipts_{canteen_id}_{start:%Y%m%d}.zip"
+        })
+
+    except ReceiptError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,153 @@
+# Staff Dashboard
+# Everything the staff dashboard shows, loaded in one request
+#
+# Each section carries a version. Clients send back the versions they already
+# have and only changed sections are returned. The independent queries run
+# concurrently on a small thread pool; orders are only queried when the
+# latest order change differs from what the client has, or is recent enough
+# that a late-committing write could still be missing.
+
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from config import Config
+from models.models import Order
+from services.menu import get_menu, get_menu_item_map
+from services.order_lines import hydrate_lines
+from services.read_routing import causal_session
+from services.stock import with_stock
+
+SECTIONS = ('menu', 'categories', 'orders', 'summary')
+
+# Orders still in the kitchen queue
+ACTIVE_STATUSES = [status for status in Order.ORDER_STATUSES if status != 'delivered']
+
+_executor = ThreadPoolExecutor(max_workers=Config.DASHBOARD_WORKERS, thread_name_prefix='dashboard')
+
+
+def _version(value):
+    return hashlib.blake2b(json.dumps(value, default=str, sort_keys=True).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def parse_versions(text):
+    """Versions a client already has, from 'menu:<version>,orders:<version>,...'"""
+    versions = {}
+    for pair in (text or '').split(','):
+        section, _, version = pair.partition(':')
+        if section in SECTIONS and version:
+            versions[section] = version
+    return versions
+
+
+def _menu_items(canteen_id):
+    # All items, including unavailable ones - staff manage them too
+    return with_stock(get_menu(canteen_id), canteen_id)
+
+
+def _latest_order_change(reader, times, canteen_id):
+    # Every order change bumps updated_at, removals included
+    with causal_session(times) as session:
+        latest = reader.orders.find_one(
+            {"canteen_id": canteen_id}, {"updated_at": 1}, sort=[("updated_at", -1)], session=session
+        )
+    return latest['updated_at'] if latest else None
+
+
+def _active_orders(reader, times, canteen_id):
+    with causal_session(times) as session:
+        return list(reader.orders.find(
+            {"canteen_id": canteen_id, "order_status": {"$in": ACTIVE_STATUSES}, "deleted_at": None},
+            session=session
+        ).sort("created_at", 1).limit(Config.DASHBOARD_MAX_ORDERS))
+
+
+def _order_counts(reader, times, canteen_id, since):
+    with causal_session(times) as session:
+        groups = list(reader.orders.aggregate([
+            {"$match": {"canteen_id": canteen_id, "created_at": {"$gte": since}, "deleted_at": None}},
+            {"$group": {
+                "_id": {"status": "$order_status", "payment": "$payment_status"},
+                "count": {"$sum": 1},
+                "amount": {"$sum": "$total_amount"}
+            }}
+        ], session=session))
+
+    counts = {
+        "orders_today": 0,
+        "by_status": {},
+        "revenue_today": 0.0,
+        "pending_payments": 0
+    }
+    for group in groups:
+        status, payment = group['_id'].get('status'), group['_id'].get('payment')
+        counts['orders_today'] += group['count']
+        counts['by_status'][status] = counts['by_status'].get(status, 0) + group['count']
+        if payment == 'success':
+            counts['revenue_today'] += group['amount']
+        elif payment == 'pending':
+            counts['pending_payments'] += group['count']
+    return counts
+
+
+def _serialize_order(order, menu):
+    order['_id'] = str(order['_id'])
+    order['created_at'] = order['created_at'].isoformat()
+    order['updated_at'] = order['updated_at'].isoformat()
+    order['status_history'] = [dict(entry, at=entry['at'].isoformat()) for entry in order.get('status_history', [])]
+    order['items'] = hydrate_lines(order['items'], menu)
+    return order
+
+
+def bootstrap(canteen_id, reader, times, known):
+    """
+    Menu, categories, active order queue and summary counts of a canteen
+    reader, times: from read_target() of the request
+    known: section -> version the client already has; those sections are left out
+    Returns: (versions, sections)
+    """
+    menu_future = _executor.submit(_menu_items, canteen_id)
+    latest_future = _executor.submit(_latest_order_change, reader, times, canteen_id)
+
+    now = datetime.utcnow()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    latest = latest_future.result()
+    # updated_at is stamped before a write commits, so an order stamped earlier may
+    # still commit after a newer one was served. Until the latest change is older
+    # than SYNC_WATERMARK_LAG_SECONDS the version changes on every request.
+    if latest is not None and latest > now - timedelta(seconds=Config.SYNC_WATERMARK_LAG_SECONDS):
+        orders_version = _version([latest, now])
+    else:
+        orders_version = _version([latest])
+
+    # Both order queries are skipped when no order changed since the client's copy
+    futures = {}
+    if known.get('orders') != orders_version:
+        futures['orders'] = _executor.submit(_active_orders, reader, times, canteen_id)
+    items = menu_future.result()
+    categories = sorted({item['category'] for item in items})
+
+    versions = {
+        "menu": _version(items),
+        "categories": _version(categories),
+        "orders": orders_version,
+    }
+    versions['summary'] = _version([today, orders_version, versions['menu']])
+    if known.get('summary') != versions['summary']:
+        futures['summary'] = _executor.submit(_order_counts, reader, times, canteen_id, today)
+
+    sections = {}
+    if known.get('menu') != versions['menu']:
+        sections['menu'] = items
+    if known.get('categories') != versions['categories']:
+        sections['categories'] = categories
+    if 'orders' in futures:
+        menu = get_menu_item_map(canteen_id)
+        sections['orders'] = [_serialize_order(order, menu) for order in futures['orders'].result()]
+    if 'summary' in futures:
+        summary = futures['summary'].result()
+        summary['menu_items'] = len(items)
+        summary['sold_out'] = sum(1 for item in items if item.get('sold_out'))
+        summary['unavailable'] = sum(1 for item in items if not item['is_available'])
+        sections['summary'] = summary
+    return versions, sections
@@ -0,0 +1,214 @@
+# Order Export
+# Streams orders from a MongoDB cursor as CSV, NDJSON or Parquet in fixed-size batches
+
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from services.order_lines import line_price
+
+# One row per order line item
+COLUMNS = [
+    'order_id', 'canteen_id', 'created_at', 'updated_at', 'user_id', 'table_number',
+    'payment_status', 'order_status', 'split_count', 'total_amount',
+    'item_id', 'item_name', 'item_price', 'quantity', 'line_total'
+]
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+class ExportError(ValueError):
+    """Raised for export requests that cannot be served (bad format, missing pyarrow)"""
+
+
+def _naive_utc(moment):
+    # Stored timestamps are naive UTC; bounds with an offset are converted to match
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def parse_date_range(start_text, end_text):
+    """
+    Parse the from/to bounds of an export (ISO dates or datetimes, UTC unless they carry an offset)
+    A date-only `to` includes that whole day
+    """
+    try:
+        start = _naive_utc(datetime.fromisoformat(start_text))
+        end = _naive_utc(datetime.fromisoformat(end_text))
+    except (TypeError, ValueError):
+        raise ExportError("from and to must be ISO dates, e.g. 2025-01-31")
+    if len(end_text) == 10:
+        end += timedelta(days=1)
+    if end <= start:
+        raise ExportError("to must be after from")
+    return start, end
+
+
+def iter_order_rows(database, canteen_id, start, end, batch_size, menu):
+    """
+    Yield flattened order line rows for orders created in [start, end)
+    Removed orders are left out
+    The cursor fetches batch_size orders per round trip, so memory use is constant
+    menu: item id -> menu item, for the item names
+    """
+    cursor = database.orders.find(
+        {"canteen_id": canteen_id, "created_at": {"$gte": start, "$lt": end}, "deleted_at": None}
+    ).sort("created_at", 1).batch_size(batch_size)
+
+    for order in cursor:
+        base = {
+            "order_id": str(order['_id']),
+            "canteen_id": order.get('canteen_id'),
+            "created_at": order.get('created_at'),
+            "updated_at": order.get('updated_at'),
+            "user_id": order.get('user_id'),
+            "table_number": None if order.get('table_number') is None else str(order['table_number']),
+            "payment_status": order.get('payment_status'),
+            "order_status": order.get('order_status'),
+            "split_count": order.get('split_count'),
+            "total_amount": order.get('total_amount'),
+        }
+        for line in order.get('items') or []:
+            price = line_price(line)
+            quantity = line.get('quantity')
+            yield dict(
+                base,
+                item_id=line.get('item_id'),
+                item_name=menu.get(line.get('item_id'), {}).get('name') or line.get('name'),
+                item_price=price,
+                quantity=quantity,
+                line_total=price * quantity if price is not None and quantity is not None else None
+            )
+
+
+def _batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _stream_csv(rows, batch_size):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+    writer.writeheader()
+    for batch in _batches(rows, batch_size):
+        for row in batch:
+            writer.writerow({
+                key: value.isoformat() if isinstance(value, datetime) else value
+                for key, value in row.items()
+            })
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _stream_ndjson(rows, batch_size):
+    for batch in _batches(rows, batch_size):
+        yield ''.join(json.dumps(row, default=_json_default) + '\n' for row in batch).encode('utf-8')
+
+
+class _ChunkSink:
+    """Write-only file object that hands out whatever was written since the last drain"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _parquet_schema(pa):
+    return pa.schema([
+        ('order_id', pa.string()),
+        ('canteen_id', pa.string()),
+        ('created_at', pa.timestamp('ms')),
+        ('updated_at', pa.timestamp('ms')),
+        ('user_id', pa.string()),
+        ('table_number', pa.string()),
+        ('payment_status', pa.string()),
+        ('order_status', pa.string()),
+        ('split_count', pa.int32()),
+        ('total_amount', pa.float64()),
+        ('item_id', pa.string()),
+        ('item_name', pa.string()),
+        ('item_price', pa.float64()),
+        ('quantity', pa.int32()),
+        ('line_total', pa.float64()),
+    ])
+
+
+def _stream_parquet(rows, batch_size):
+    # pyarrow is large and only needed here, so it is imported on first use
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(pa)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        # Each batch becomes one row group, streamed as soon as it is written
+        for batch in _batches(rows, batch_size):
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_export(rows, export_format, batch_size):
+    """
+    Encode rows in the requested format
+    Returns a generator of byte chunks, one per batch
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError(f"Unsupported format '{export_format}' - use one of {', '.join(EXPORT_FORMATS)}")
+
+    if export_format == 'parquet':
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise ExportError("Parquet export requires pyarrow to be installed")
+        return _stream_parquet(rows, batch_size)
+
+    if export_format == 'csv':
+        return _stream_csv(rows, batch_size)
+    return _stream_ndjson(rows, batch_size)
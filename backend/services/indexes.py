@@ -0,0 +1,80 @@
+# Database Indexes and Partitioning
+# Index definitions and helpers for sharding collections per canteen
+
+from bson.min_key import MinKey
+from bson.max_key import MaxKey
+from pymongo import ASCENDING, DESCENDING, HASHED, IndexModel
+from config import Config
+
+# Every tenant-scoped index is prefixed with canteen_id so that queries
+# never touch another canteen's entries
+INDEXES = {
+    'users': [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    'menu_items': [
+        IndexModel([("canteen_id", ASCENDING), ("is_available", ASCENDING), ("category", ASCENDING)],
+                   name="canteen_available_category"),
+        IndexModel([("canteen_id", ASCENDING), ("stock", ASCENDING)],
+                   name="canteen_stock", partialFilterExpression={"stock": {"$type": "number"}}),
+    ],
+    'orders': [
+        IndexModel([("canteen_id", ASCENDING), ("created_at", DESCENDING)],
+                   name="canteen_created"),
+        # Staff dashboard: active (not yet delivered) orders, oldest first
+        IndexModel([("canteen_id", ASCENDING), ("order_status", ASCENDING), ("created_at", ASCENDING)],
+                   name="canteen_status_created"),
+        IndexModel([("canteen_id", ASCENDING), ("user_id", ASCENDING), ("created_at", DESCENDING)],
+                   name="canteen_user_created"),
+        # Delta sync: orders changed after a client's watermark
+        IndexModel([("canteen_id", ASCENDING), ("updated_at", ASCENDING)],
+                   name="canteen_updated"),
+        IndexModel([("canteen_id", ASCENDING), ("user_id", ASCENDING), ("updated_at", ASCENDING)],
+                   name="canteen_user_updated"),
+        IndexModel([("canteen_id", ASCENDING), ("_id", HASHED)],
+                   name="canteen_shard_key"),
+    ],
+    'item_popularity': [
+        IndexModel([("canteen_id", ASCENDING), ("item_id", ASCENDING)],
+                   name="canteen_item_unique", unique=True),
+    ],
+    'order_stage_stats': [
+        IndexModel([("canteen_id", ASCENDING), ("from", ASCENDING), ("to", ASCENDING),
+                    ("dim_type", ASCENDING), ("minute", ASCENDING)],
+                   name="canteen_stage_window"),
+        IndexModel([("minute", ASCENDING)], name="minute_ttl",
+                   expireAfterSeconds=Config.STAGE_STATS_RETENTION_DAYS * 86400),
+    ],
+}
+
+# Orders are range-partitioned by canteen first, then hashed within a canteen,
+# so each canteen's orders can be pinned to their own shard zone
+ORDERS_SHARD_KEY = {"canteen_id": 1, "_id": "hashed"}
+
+
+def ensure_indexes(db):
+    """Create all indexes (no-op for indexes that already exist)"""
+    for collection, indexes in INDEXES.items():
+        db[collection].create_indexes(indexes)
+
+
+def shard_orders(client, db_name):
+    """Enable sharding for the orders collection (requires a sharded cluster)"""
+    client.admin.command('enableSharding', db_name)
+    client.admin.command('shardCollection', f"{db_name}.orders", key=ORDERS_SHARD_KEY)
+
+
+def assign_canteen_zone(client, db_name, canteen_id, zone, shard=None):
+    """
+    Pin all orders of a canteen to a shard zone
+    A busy canteen can be given its own zone so its load stays on its own shards
+    """
+    if shard:
+        client.admin.command('addShardToZone', shard, zone=zone)
+    client.admin.command(
+        'updateZoneKeyRange',
+        f"{db_name}.orders",
+        min={"canteen_id": canteen_id, "_id": MinKey()},
+        max={"canteen_id": canteen_id, "_id": MaxKey()},
+        zone=zone
+    )
@@ -0,0 +1,43 @@
+# Menu Cache
+# Per-canteen cache of menu items to keep menu reads off MongoDB
+
+import time
+from extensions import db, secondary_db
+from config import Config
+from services.cache import TTLCache
+
+menu_cache = TTLCache(ttl=Config.MENU_CACHE_TTL)
+
+# Canteens whose menu changed recently - reloaded from the primary until the
+# secondaries are guaranteed to have caught up
+_recent_writes = {}
+
+
+def _load_menu(canteen_id):
+    reader = secondary_db
+    if _recent_writes.get(canteen_id, 0) > time.monotonic():
+        reader = db
+
+    items = list(reader.menu_items.find({"canteen_id": canteen_id}).sort("_id", 1))
+    for item in items:
+        item['_id'] = str(item['_id'])
+    return items, {item['_id']: item for item in items}
+
+
+def get_menu(canteen_id):
+    """
+    Get all menu items of a canteen, including unavailable ones
+    The returned list is shared between requests - do not modify it
+    """
+    return menu_cache.get_or_load(canteen_id, lambda: _load_menu(canteen_id))[0]
+
+
+def get_menu_item_map(canteen_id):
+    """Get the cached menu of a canteen as a dict of item id -> item"""
+    return menu_cache.get_or_load(canteen_id, lambda: _load_menu(canteen_id))[1]
+
+
+def invalidate_menu(canteen_id):
+    """Drop the cached menu after a menu item is added, updated or deleted"""
+    _recent_writes[canteen_id] = time.monotonic() + Config.READ_MAX_STALENESS_SECONDS
+    menu_cache.invalidate(canteen_id)
@@ -0,0 +1,90 @@
+# Order Lines
+# Compact storage form of order line items and their hydration for display
+#
+# Orders store one line per menu item: {item_id, quantity, price_paise}, with the
+# price read from the menu item when its stock is reserved. Item names are not
+# stored; they are filled in from the cached menu when orders are read.
+# Orders created before this format store {item_id, name, price, quantity, ...}
+# and are still understood until they are migrated.
+
+from decimal import Decimal, ROUND_HALF_UP
+from bson import ObjectId
+from config import Config
+
+
+def to_paise(rupees):
+    return int(round(rupees * 100))
+
+
+def compact_lines(quantities, prices):
+    """
+    Compact lines for a new order
+    quantities: item id -> total quantity; prices: item id -> current price in rupees
+    """
+    return [
+        {"item_id": item_id, "quantity": quantity, "price_paise": to_paise(prices[item_id])}
+        for item_id, quantity in quantities.items()
+    ]
+
+
+def order_total(lines):
+    """Amount charged for compact lines: menu prices plus Config.TAX_RATE, in rupees"""
+    subtotal_paise = sum(line['price_paise'] * line['quantity'] for line in lines)
+    # Half paise round up, like the bill page and the printed tax line
+    total_paise = (Decimal(subtotal_paise) * (1 + Decimal(str(Config.TAX_RATE)))).quantize(Decimal(1), ROUND_HALF_UP)
+    return int(total_paise) / 100
+
+
+def compact_legacy_lines(lines, menu):
+    """
+    Compact lines of an order stored in the old format
+    Keeps the price that was paid, falling back to the menu price when it is missing
+    Lines of the same item at the same price are merged
+    """
+    merged = {}
+    for line in lines:
+        if 'price_paise' in line:
+            price_paise = line['price_paise']
+        elif isinstance(line.get('price'), (int, float)):
+            price_paise = to_paise(line['price'])
+        else:
+            price_paise = to_paise(menu.get(line.get('item_id'), {}).get('price', 0))
+        key = (str(line.get('item_id')), price_paise)
+        merged[key] = merged.get(key, 0) + int(line.get('quantity') or 0)
+    return [
+        {"item_id": item_id, "quantity": quantity, "price_paise": price_paise}
+        for (item_id, price_paise), quantity in merged.items()
+    ]
+
+
+def line_price(line):
+    """Unit price paid for a line, in rupees"""
+    if 'price_paise' in line:
+        return line['price_paise'] / 100
+    return line.get('price')
+
+
+def line_quantities(lines):
+    """Total quantity per menu item, skipping lines that do not reference a menu item"""
+    quantities = {}
+    for line in lines:
+        if ObjectId.is_valid(line.get('item_id')):
+            quantities[line['item_id']] = quantities.get(line['item_id'], 0) + line['quantity']
+    return quantities
+
+
+def hydrate_lines(lines, menu):
+    """
+    Display form of stored lines: {item_id, name, price, quantity}
+    Prices are the prices paid; names come from the menu
+    """
+    hydrated = []
+    for line in lines:
+        item = menu.get(line.get('item_id'), {})
+        hydrated.append({
+            "item_id": line.get('item_id'),
+            "name": item.get('name') or line.get('name') or 'Item',
+            "price": line_price(line),
+            "quantity": line.get('quantity')
+        })
+    return hydrated
@@ -0,0 +1,121 @@
+# Item Popularity
+# Rolling per-item order counters with exponentially decayed hourly and daily scores
+#
+# Each order adds its quantities to one counter document per item. A score
+# decays by exp(-elapsed / window) between updates, so it approximates the
+# number of portions ordered over the last hour or day without keeping (or
+# scanning) the order history. Reads decay the stored scores to "now".
+
+import math
+from datetime import datetime
+from pymongo import UpdateOne
+from extensions import db, secondary_db
+from config import Config
+from services.cache import TTLCache
+
+# Decay time constant of each score, in seconds
+WINDOWS = {'hour': 3600, 'day': 86400}
+
+popularity_cache = TTLCache(ttl=Config.POPULARITY_CACHE_TTL)
+
+
+def _decayed_score(field, seconds, now):
+    """Aggregation expression: the stored score decayed from its last update to now, never grown"""
+    elapsed_ms = {"$max": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 0]}
+    return {"$multiply": [
+        {"$ifNull": [f"${field}", 0]},
+        {"$exp": {"$divide": [{"$multiply": [elapsed_ms, -1]}, seconds * 1000]}}
+    ]}
+
+
+def _counter_op(canteen_id, item_id, quantity, now):
+    update = {f"{window}_score": {"$add": [_decayed_score(f"{window}_score", seconds, now), quantity]}
+              for window, seconds in WINDOWS.items()}
+    update['total'] = {"$add": [{"$ifNull": ["$total", 0]}, quantity]}
+    update['updated_at'] = {"$max": [{"$ifNull": ["$updated_at", now]}, now]}
+    return UpdateOne({"canteen_id": canteen_id, "item_id": item_id}, [{"$set": update}], upsert=True)
+
+
+def record_order(canteen_id, quantities, at):
+    """
+    Add an order's quantities to the item counters
+    quantities: item id -> total quantity ordered
+    """
+    operations = [_counter_op(canteen_id, item_id, quantity, at) for item_id, quantity in quantities.items()]
+    if operations:
+        db.item_popularity.bulk_write(operations, ordered=False)
+
+
+def _load_counters(canteen_id):
+    return {
+        counter['item_id']: counter
+        for counter in secondary_db.item_popularity.find(
+            {"canteen_id": canteen_id}, {"_id": 0, "item_id": 1, "hour_score": 1, "day_score": 1, "total": 1, "updated_at": 1}
+        )
+    }
+
+
+def get_scores(canteen_id, now=None):
+    """
+    Current scores of every ordered item of a canteen (cached)
+    Returns: item id -> {"hour": ..., "day": ..., "total": ...}
+    """
+    now = now or datetime.utcnow()
+    counters = popularity_cache.get_or_load(canteen_id, lambda: _load_counters(canteen_id))
+    scores = {}
+    for item_id, counter in counters.items():
+        elapsed = max((now - counter['updated_at']).total_seconds(), 0)
+        scores[item_id] = {
+            window: counter.get(f"{window}_score", 0) * math.exp(-elapsed / seconds)
+            for window, seconds in WINDOWS.items()
+        }
+        scores[item_id]['total'] = counter.get('total', 0)
+    return scores
+
+
+def rank_items(items, canteen_id, window='hour'):
+    """
+    Sort menu items by popularity over window, most popular first
+    Ties (including never-ordered items) fall back to the other window, then menu order
+    """
+    scores = get_scores(canteen_id)
+    other = 'day' if window == 'hour' else 'hour'
+    empty = {'hour': 0, 'day': 0, 'total': 0}
+    return sorted(
+        items,
+        key=lambda item: (-scores.get(item['_id'], empty)[window], -scores.get(item['_id'], empty)[other])
+    )
+
+
+def rebuild_popularity(database, canteen_id, batch_size=5000, now=None):
+    """
+    Recompute the counters of a canteen by replaying its order history in batches
+    Removed orders are not counted. Returns the number of orders replayed.
+    """
+    now = now or datetime.utcnow()
+    counters = {}
+    replayed = 0
+    cursor = database.orders.find(
+        {"canteen_id": canteen_id, "deleted_at": None, "created_at": {"$lte": now}},
+        {"items.item_id": 1, "items.quantity": 1, "created_at": 1}
+    ).sort("created_at", 1).batch_size(batch_size)
+
+    for order in cursor:
+        replayed += 1
+        age = (now - order['created_at']).total_seconds()
+        weights = {window: math.exp(-age / seconds) for window, seconds in WINDOWS.items()}
+        for line in order.get('items') or []:
+            counter = counters.setdefault(line['item_id'], {"hour_score": 0.0, "day_score": 0.0, "total": 0})
+            counter['hour_score'] += line['quantity'] * weights['hour']
+            counter['day_score'] += line['quantity'] * weights['day']
+            counter['total'] += line['quantity']
+
+    operations = [
+        UpdateOne({"canteen_id": canteen_id, "item_id": item_id}, {"$set": dict(counter, updated_at=now)}, upsert=True)
+        for item_id, counter in counters.items()
+    ]
+    for start in range(0, len(operations), batch_size):
+        database.item_popularity.bulk_write(operations[start:start + batch_size], ordered=False)
+    database.item_popularity.delete_many({"canteen_id": canteen_id, "item_id": {"$nin": list(counters)}})
+    popularity_cache.invalidate(canteen_id)
+    return replayed
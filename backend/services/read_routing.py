@@ -0,0 +1,114 @@
+# Read Routing
+# Routes declare how fresh their data must be; stale-tolerant reads go to secondaries
+
+import base64
+from contextlib import contextmanager
+from functools import wraps
+import bson
+from flask import g, request
+from extensions import mongo, db, secondary_db
+
+# Read consistency levels a route can declare
+STALE_OK = 'stale_ok'  # Menu and historical data - any secondary within max staleness
+CAUSAL = 'causal'      # Must see the client's own earlier writes - primary
+PRIMARY = 'primary'    # Default for routes that declare nothing
+
+# Returned after writes and sent back by the client on later reads
+CAUSAL_TOKEN_HEADER = 'X-Causal-Token'
+
+
+def reads(consistency):
+    """
+    Route decorator declaring the read consistency the route needs
+    Usage: @reads(STALE_OK) below @jwt_required()
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            g.read_consistency = consistency
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _encode_token(session):
+    times = {"operation_time": session.operation_time, "cluster_time": session.cluster_time}
+    return base64.urlsafe_b64encode(bson.encode(times)).decode()
+
+
+def _decode_token(token):
+    try:
+        times = bson.decode(base64.urlsafe_b64decode(token.encode()))
+    except Exception:
+        return None
+    if not times.get('operation_time') or not times.get('cluster_time'):
+        return None
+    return times
+
+
+def read_target():
+    """
+    (database, causal times) matching the current route's declared consistency
+    - STALE_OK: secondaries, no times
+    - CAUSAL: primary, in a causal session after the client's last write (from
+      its X-Causal-Token) when one was sent. Order reads are canteen-wide for
+      staff, so a secondary could miss other clients' new orders.
+    - PRIMARY: primary
+    Must be called in the request; the result can be handed to worker threads
+    """
+    consistency = g.get('read_consistency', PRIMARY)
+
+    if consistency == STALE_OK:
+        return secondary_db, None
+
+    times = None
+    if consistency == CAUSAL and secondary_db is not db:
+        token = request.headers.get(CAUSAL_TOKEN_HEADER)
+        times = _decode_token(token) if token else None
+    return db, times
+
+
+@contextmanager
+def causal_session(times):
+    """
+    Causally consistent session that waits for the write described by times
+    Yields None when times is None. Sessions are not thread-safe, so each
+    thread reading in parallel opens its own.
+    """
+    if times is None:
+        yield None
+        return
+
+    with mongo.cx.start_session(causal_consistency=True) as session:
+        session.advance_cluster_time(times['cluster_time'])
+        session.advance_operation_time(times['operation_time'])
+        yield session
+
+
+@contextmanager
+def read_from():
+    """Yields (database, session) matching the current route's declared consistency"""
+    reader, times = read_target()
+    with causal_session(times) as session:
+        yield reader, session
+
+
+@contextmanager
+def write_session():
+    """
+    Causally consistent session for writes
+    Its operation time is returned to the client as X-Causal-Token so that later
+    CAUSAL reads - possibly served by another worker - wait for the write
+    """
+    with mongo.cx.start_session(causal_consistency=True) as session:
+        yield session
+        if session.operation_time is not None:
+            g.causal_token = _encode_token(session)
+
+
+def attach_causal_token(response):
+    """after_request hook adding the causal token of this request's writes"""
+    token = g.get('causal_token')
+    if token:
+        response.headers[CAUSAL_TOKEN_HEADER] = token
+    return response
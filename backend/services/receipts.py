@@ -0,0 +1,296 @@
+# Receipts
+# Renders order and table receipts as HTML, PDF and thermal-printer text
+#
+# Rendered receipts are cached under the ids and updated_at timestamps of the
+# orders they were built from. Payment and status changes bump updated_at, so
+# a changed order gets a new key and a stale receipt is never served.
+#
+# This module must not import the Flask app or the database: batch rendering
+# runs it in worker processes.
+
+import html
+import io
+import multiprocessing
+import os
+import textwrap
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from itertools import repeat
+from config import Config
+from services.cache import TTLCache
+from services.order_lines import line_price
+
+RECEIPT_FORMATS = {
+    'html': ('text/html', 'html'),
+    'pdf': ('application/pdf', 'pdf'),
+    'text': ('text/plain', 'txt'),
+}
+
+# Same rate as the order totals
+TAX_RATE = Config.TAX_RATE
+
+MIN_WIDTH = 24
+MAX_WIDTH = 64
+
+# Below this many receipts, starting worker processes costs more than it saves
+POOL_MIN_RECEIPTS = 64
+
+receipt_cache = TTLCache(ttl=Config.RECEIPT_CACHE_TTL, maxsize=Config.RECEIPT_CACHE_SIZE)
+
+
+class ReceiptError(ValueError):
+    """Raised for receipt requests that cannot be served (bad format, width or date)"""
+
+
+def check_options(receipt_format, width):
+    if receipt_format not in RECEIPT_FORMATS:
+        raise ReceiptError(f"Unsupported format '{receipt_format}' - use one of {', '.join(RECEIPT_FORMATS)}")
+    if not MIN_WIDTH <= width <= MAX_WIDTH:
+        raise ReceiptError(f"width must be between {MIN_WIDTH} and {MAX_WIDTH} characters")
+
+
+def day_range(day_text):
+    """[start, end) of a YYYY-MM-DD day (UTC), today when day_text is empty"""
+    if not day_text:
+        start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    else:
+        try:
+            start = datetime.strptime(day_text, '%Y-%m-%d')
+        except ValueError:
+            raise ReceiptError("date must be YYYY-MM-DD")
+    return start, start + timedelta(days=1)
+
+
+def cache_key(orders, receipt_format, width):
+    """Orders only need _id and updated_at, so a projection is enough to look up the cache"""
+    return (receipt_format, width, tuple((str(order['_id']), order['updated_at']) for order in orders))
+
+
+def build_receipt(orders, canteen, menu):
+    """
+    Collect everything a receipt shows from one order, or several orders of a table
+    menu: item id -> menu item, for the item names
+    """
+    lines = {}
+    for order in orders:
+        for line in order.get('items') or []:
+            item = menu.get(line.get('item_id'), {})
+            name = item.get('name') or line.get('name') or 'Item'
+            price = line_price(line)
+            if price is None:
+                price = item.get('price', 0)
+            key = (name, price)
+            lines[key] = lines.get(key, 0) + line.get('quantity', 0)
+
+    first = orders[0]
+    subtotal = sum(price * quantity for (_, price), quantity in lines.items())
+    if len(orders) == 1:
+        title = f"Order #{str(first['_id'])[-8:].upper()}"
+    else:
+        title = f"Table {first.get('table_number')} - {len(orders)} orders"
+
+    return {
+        "canteen": canteen['name'],
+        "title": title,
+        "created_at": min(order['created_at'] for order in orders),
+        "table_number": first.get('table_number'),
+        "split_count": first.get('split_count', 1) if len(orders) == 1 else 1,
+        "per_person": first.get('per_person_amount') if len(orders) == 1 else None,
+        "lines": [
+            {"name": name, "price": price, "quantity": quantity, "total": price * quantity}
+            for (name, price), quantity in lines.items()
+        ],
+        "subtotal": subtotal,
+        "tax": subtotal * TAX_RATE,
+        "total": sum(order.get('total_amount', 0) for order in orders),
+        "payment_status": 'success' if all(o.get('payment_status') == 'success' for o in orders) else 'pending',
+        "order_status": first.get('order_status') if len(orders) == 1 else None,
+    }
+
+
+def _money(amount):
+    return f"{amount:,.2f}"
+
+
+def _row(left, right, width):
+    return left[:width - len(right) - 1].ljust(width - len(right)) + right
+
+
+def _text_lines(receipt, width):
+    rule = '-' * width
+    lines = [receipt['canteen'][:width].center(width), '=' * width, receipt['title'][:width]]
+    lines.append(f"Date: {receipt['created_at']:%d %b %Y %H:%M} UTC"[:width])
+    if receipt['table_number'] is not None:
+        lines.append(f"Table: {receipt['table_number']}")
+    if receipt['split_count'] > 1:
+        lines.append(f"People: {receipt['split_count']}")
+    lines.append(rule)
+
+    for line in receipt['lines']:
+        lines.extend(textwrap.wrap(line['name'], width) or [''])
+        lines.append(_row(f"  {line['quantity']} x {_money(line['price'])}", _money(line['total']), width))
+    lines.append(rule)
+
+    lines.append(_row("Subtotal", _money(receipt['subtotal']), width))
+    lines.append(_row(f"Tax ({TAX_RATE:.0%})", _money(receipt['tax']), width))
+    if receipt['per_person'] is not None and receipt['split_count'] > 1:
+        lines.append(_row("Per person", _money(receipt['per_person']), width))
+    lines.append(_row("TOTAL", f"Rs. {_money(receipt['total'])}", width))
+    lines.append(rule)
+
+    status = f"Payment: {receipt['payment_status'].upper()}"
+    if receipt['order_status']:
+        status += f"  Status: {receipt['order_status'].upper()}"
+    lines.extend(textwrap.wrap(status, width))
+    lines.append('')
+    lines.append("Thank You! Visit Again!"[:width].center(width))
+    return lines
+
+
+def render_text(receipt, width):
+    """Fixed-width text for thermal printers (32 columns on 58mm paper, 48 on 80mm)"""
+    return ('\n'.join(line.rstrip() for line in _text_lines(receipt, width)) + '\n').encode('utf-8')
+
+
+def render_html(receipt, width=None):
+    """Standalone printable HTML page"""
+    esc = html.escape
+    info = [("Order", receipt['title']), ("Date", f"{receipt['created_at']:%d %b %Y %H:%M} UTC")]
+    if receipt['table_number'] is not None:
+        info.append(("Table No", receipt['table_number']))
+    if receipt['split_count'] > 1:
+        info.append(("No. of People", receipt['split_count']))
+
+    summary = [("Subtotal", receipt['subtotal']), (f"Tax ({TAX_RATE:.0%})", receipt['tax'])]
+    if receipt['per_person'] is not None and receipt['split_count'] > 1:
+        summary.append(("Per Person", receipt['per_person']))
+
+    parts = [
+        '<!DOCTYPE html><html><head><meta charset="utf-8">',
+        f'<title>Bill - {esc(receipt["title"])}</title><style>',
+        'body{font-family:Arial,sans-serif;padding:20px}'
+        '.bill{max-width:400px;margin:0 auto}'
+        '.header{text-align:center;border-bottom:2px dashed #333;padding-bottom:15px;margin-bottom:15px}'
+        '.row{display:flex;justify-content:space-between;margin:5px 0;font-size:14px}'
+        '.qty{color:#666;font-size:12px}'
+        '.section{border-bottom:2px dashed #333;padding-bottom:10px;margin-bottom:10px}'
+        '.total{font-size:18px;font-weight:bold}'
+        '.footer{text-align:center;font-size:12px;color:#666}',
+        '</style></head><body><div class="bill">',
+        f'<div class="header"><h1>{esc(receipt["canteen"])}</h1></div><div class="section">',
+    ]
+    for label, value in info:
+        parts.append(f'<div class="row"><strong>{esc(label)}:</strong><span>{esc(str(value))}</span></div>')
+    parts.append('</div><div class="section">')
+    for line in receipt['lines']:
+        parts.append(
+            f'<div class="row"><div>{esc(line["name"])}'
+            f'<div class="qty">Qty: {line["quantity"]} &times; &#8377;{_money(line["price"])}</div></div>'
+            f'<strong>&#8377;{_money(line["total"])}</strong></div>'
+        )
+    parts.append('</div><div class="section">')
+    for label, amount in summary:
+        parts.append(f'<div class="row"><span>{esc(label)}:</span><span>&#8377;{_money(amount)}</span></div>')
+    parts.append(
+        f'<div class="row total"><span>Total Amount:</span><span>&#8377;{_money(receipt["total"])}</span></div>'
+        f'<div class="row"><span>Payment:</span><span>{esc(receipt["payment_status"].title())}</span></div>'
+        '</div><div class="footer"><p><strong>Thank You! Visit Again!</strong></p></div>'
+        '</div></body></html>'
+    )
+    return ''.join(parts).encode('utf-8')
+
+
+def _pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def render_pdf(receipt, width):
+    """
+    Single-page PDF of the thermal text layout
+    Written by hand with the built-in Courier font, so no PDF library is needed
+    """
+    lines = _text_lines(receipt, width)
+    font_size, margin = 9, 18
+    leading = font_size * 1.35
+    page_width = width * font_size * 0.6 + 2 * margin
+    page_height = len(lines) * leading + 2 * margin
+
+    content = [f"BT /F1 {font_size} Tf {leading:.2f} TL {margin} {page_height - margin - font_size:.2f} Td"]
+    content.extend(f"({_pdf_escape(line)}) Tj T*" for line in lines)
+    content.append("ET")
+    stream = '\n'.join(content).encode('latin-1', 'replace')
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width:.2f} {page_height:.2f}] "
+         f"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>").encode('ascii'),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+    ]
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        output.write(b"%010d 00000 n \n" % offset)
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n" % (len(objects) + 1, xref))
+    output.write(b"%%EOF\n")
+    return output.getvalue()
+
+
+_RENDERERS = {'html': render_html, 'pdf': render_pdf, 'text': render_text}
+
+
+def render_receipt(receipt, receipt_format, width):
+    return _RENDERERS[receipt_format](receipt, width)
+
+
+def render_cached(order_groups, canteen, menu, receipt_format, width, workers=1):
+    """
+    Render one receipt per group of orders, reusing cached receipts
+    Misses are rendered on a process pool when workers > 1 and there are enough of them
+    Returns the receipt bodies in the order of order_groups
+    """
+    keys = [cache_key(orders, receipt_format, width) for orders in order_groups]
+    bodies = [receipt_cache.get(key) for key in keys]
+    misses = [index for index, body in enumerate(bodies) if body is None]
+    if not misses:
+        return bodies
+
+    receipts = [build_receipt(order_groups[index], canteen, menu) for index in misses]
+    if workers > 1 and len(receipts) >= POOL_MIN_RECEIPTS:
+        # spawn, not fork: web workers hold MongoClient threads that must not be forked
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            rendered = list(executor.map(
+                render_receipt, receipts, repeat(receipt_format), repeat(width),
+                chunksize=max(1, len(receipts) // (workers * 4))
+            ))
+    else:
+        rendered = [render_receipt(receipt, receipt_format, width) for receipt in receipts]
+
+    for index, body in zip(misses, rendered):
+        bodies[index] = body
+        receipt_cache.set(keys[index], body)
+    return bodies
+
+
+def batch_workers():
+    """Worker processes for batch rendering (RECEIPT_WORKERS, 0 = one per CPU)"""
+    return Config.RECEIPT_WORKERS or os.cpu_count() or 1
+
+
+def build_archive(orders, bodies, receipt_format):
+    """Zip of one receipt file per order"""
+    extension = RECEIPT_FORMATS[receipt_format][1]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for order, body in zip(orders, bodies):
+            archive.writestr(f"receipt_{order['created_at']:%H%M%S}_{order['_id']}.{extension}", body)
+    return buffer.getvalue()
@@ -0,0 +1,182 @@
+# Order Stage Statistics
+# Incrementally aggregated durations between order statuses (e.g. placed -> ready)
+#
+# Every status change adds one sample per earlier status to per-minute bucket
+# documents holding a count, a sum and a fixed-bin histogram. Percentiles for a
+# time window are computed by merging the buckets in that window, so queries
+# never scan the order history.
+
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from extensions import db
+from config import Config
+from services.menu import get_menu_item_map
+
+# Upper edges (seconds) of the histogram bins; the last bin holds everything slower
+BIN_EDGES = [15, 30, 60, 90, 120, 180, 240, 300, 420, 600, 900, 1200, 1800, 2700, 3600, 5400, 7200]
+
+# Dimensions every sample is recorded under
+DIM_ALL = 'all'
+DIM_ITEM = 'item'
+DIM_CATEGORY = 'category'
+
+
+def _bin_index(seconds):
+    for index, edge in enumerate(BIN_EDGES):
+        if seconds <= edge:
+            return index
+    return len(BIN_EDGES)
+
+
+def _timeline(order):
+    """First time the order reached each status"""
+    history = order.get('status_history') or [{"status": "placed", "at": order['created_at']}]
+    reached = {}
+    for entry in history:
+        reached.setdefault(entry['status'], entry['at'])
+    return reached
+
+
+def _dimensions(order, menu):
+    dimensions = [(DIM_ALL, DIM_ALL)]
+    for line in order.get('items', []):
+        dimensions.append((DIM_ITEM, line['item_id']))
+        item = menu.get(line['item_id'])
+        if item:
+            dimensions.append((DIM_CATEGORY, item['category']))
+    return list(dict.fromkeys(dimensions))
+
+
+def _transition_ops(order, reached, to_status, at, dimensions):
+    """Bucket upserts for the durations from every status in reached to to_status"""
+    minute = at.replace(second=0, microsecond=0)
+    operations = []
+    for from_status, started_at in reached.items():
+        seconds = max((at - started_at).total_seconds(), 0)
+        for dim_type, dim_value in dimensions:
+            operations.append(UpdateOne(
+                {
+                    "canteen_id": order['canteen_id'],
+                    "from": from_status,
+                    "to": to_status,
+                    "dim_type": dim_type,
+                    "dim_value": dim_value,
+                    "minute": minute
+                },
+                {
+                    "$inc": {"count": 1, "sum_seconds": seconds, f"hist.{_bin_index(seconds)}": 1},
+                    "$setOnInsert": {"hour": minute.hour}
+                },
+                upsert=True
+            ))
+    return operations
+
+
+def record_transition(order, to_status, at):
+    """
+    Record the durations from every earlier status of the order to to_status
+    order: the order document as it was before the status change
+    """
+    reached = _timeline(order)
+    if to_status in reached:
+        return
+
+    dimensions = _dimensions(order, get_menu_item_map(order['canteen_id']))
+    operations = _transition_ops(order, reached, to_status, at, dimensions)
+    if operations:
+        db.order_stage_stats.bulk_write(operations, ordered=False)
+
+
+def rebuild_stage_stats(database, canteen_id, batch_size=5000, now=None):
+    """
+    Recompute the stage buckets of a canteen by replaying the status_history of
+    its orders in batches, e.g. after importing or generating orders
+    Only orders inside the retention window are replayed; removed orders are not
+    counted. Status changes made while the rebuild runs may be lost.
+    Returns the number of orders replayed.
+    """
+    now = now or datetime.utcnow()
+    menu = {str(item['_id']): item for item in database.menu_items.find({"canteen_id": canteen_id})}
+    database.order_stage_stats.delete_many({"canteen_id": canteen_id})
+
+    replayed = 0
+    operations = []
+    cursor = database.orders.find(
+        {
+            "canteen_id": canteen_id,
+            "deleted_at": None,
+            "created_at": {"$gte": now - timedelta(days=Config.STAGE_STATS_RETENTION_DAYS)}
+        },
+        {"canteen_id": 1, "created_at": 1, "status_history": 1, "items.item_id": 1}
+    ).batch_size(batch_size)
+
+    for order in cursor:
+        replayed += 1
+        history = order.get('status_history') or []
+        dimensions = _dimensions(order, menu)
+        # Same samples as record_transition produced when each status was first reached
+        for index, entry in enumerate(history):
+            reached = _timeline(dict(order, status_history=history[:index]))
+            if entry['status'] not in reached:
+                operations.extend(_transition_ops(order, reached, entry['status'], entry['at'], dimensions))
+        if len(operations) >= batch_size:
+            database.order_stage_stats.bulk_write(operations, ordered=False)
+            operations = []
+
+    if operations:
+        database.order_stage_stats.bulk_write(operations, ordered=False)
+    return replayed
+
+
+def _percentile(hist, count, fraction):
+    """Estimate a percentile from a histogram by interpolating inside its bin"""
+    target = fraction * count
+    seen = 0
+    for index in range(len(BIN_EDGES) + 1):
+        in_bin = hist.get(index, 0)
+        if in_bin and seen + in_bin >= target:
+            lower = BIN_EDGES[index - 1] if index > 0 else 0
+            if index == len(BIN_EDGES):
+                return float(lower)
+            return lower + (BIN_EDGES[index] - lower) * (target - seen) / in_bin
+        seen += in_bin
+    return None
+
+
+def stage_percentiles(database, canteen_id, from_status, to_status, window_minutes,
+                      group_by=None, percentiles=(50, 90, 95), now=None):
+    """
+    Duration percentiles (seconds) for from_status -> to_status over the last window_minutes
+    group_by: None, 'hour' (hour of day), 'item' or 'category'
+    """
+    now = now or datetime.utcnow()
+    dim_type = group_by if group_by in (DIM_ITEM, DIM_CATEGORY) else DIM_ALL
+    buckets = database.order_stage_stats.find({
+        "canteen_id": canteen_id,
+        "from": from_status,
+        "to": to_status,
+        "dim_type": dim_type,
+        "minute": {"$gte": now - timedelta(minutes=window_minutes)}
+    })
+
+    groups = {}
+    for bucket in buckets:
+        key = bucket['hour'] if group_by == 'hour' else bucket['dim_value']
+        group = groups.setdefault(key, {"count": 0, "sum_seconds": 0.0, "hist": {}})
+        group['count'] += bucket['count']
+        group['sum_seconds'] += bucket['sum_seconds']
+        for index, count in bucket.get('hist', {}).items():
+            group['hist'][int(index)] = group['hist'].get(int(index), 0) + count
+
+    results = []
+    for key in sorted(groups, key=str):
+        group = groups[key]
+        result = {
+            "key": key,
+            "count": group['count'],
+            "mean_seconds": group['sum_seconds'] / group['count']
+        }
+        for p in percentiles:
+            result[f"p{p:g}"] = _percentile(group['hist'], group['count'], p / 100)
+        results.append(result)
+    return results
@@ -0,0 +1,150 @@
+# Stock Tracking
+# Atomic per-item stock reservation for orders, plus a short-lived stock cache for menu reads
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from extensions import db
+from config import Config
+from services.cache import TTLCache
+
+stock_cache = TTLCache(ttl=Config.STOCK_CACHE_TTL)
+
+
+class OutOfStockError(Exception):
+    """Raised when an order line cannot be reserved"""
+
+    def __init__(self, item_id):
+        super().__init__(f"Item {item_id} is out of stock or unavailable")
+        self.item_id = item_id
+
+
+def _is_tracked():
+    # Items without a numeric stock are not stock-tracked
+    return {"$isNumber": "$stock"}
+
+
+def _sold_out():
+    # A stock-tracked item with no portions left
+    return {"$and": [_is_tracked(), {"$lte": ["$stock", 0]}]}
+
+
+def sold_out_update():
+    """Pipeline stage hiding an item from the menu once its stock reaches zero"""
+    return {"$set": {
+        "is_available": {"$cond": [_sold_out(), False, "$is_available"]},
+        "sold_out": {"$cond": [_sold_out(), True, {"$ifNull": ["$sold_out", False]}]}
+    }}
+
+
+def _reserve_filter(canteen_id, item_id, quantity):
+    """Only matches an existing, available item with enough stock left"""
+    return {
+        "_id": ObjectId(item_id),
+        "canteen_id": canteen_id,
+        "is_available": True,
+        "$or": [{"stock": None}, {"stock": {"$gte": quantity}}]
+    }
+
+
+def _reserve_update(quantity):
+    """Conditional decrement of one item, hiding it as soon as the last portion is sold"""
+    return [
+        {"$set": {"stock": {"$cond": [_is_tracked(), {"$subtract": ["$stock", quantity]}, "$stock"]}}},
+        sold_out_update()
+    ]
+
+
+def _release_op(canteen_id, item_id, quantity):
+    """Undo a reservation, making an item that sold out through it available again"""
+    return UpdateOne(
+        {"_id": ObjectId(item_id), "canteen_id": canteen_id},
+        [
+            {"$set": {"stock": {"$cond": [_is_tracked(), {"$add": ["$stock", quantity]}, "$stock"]}}},
+            {"$set": {
+                "is_available": {"$cond": [
+                    {"$and": [{"$eq": ["$sold_out", True]}, {"$gt": ["$stock", 0]}]}, True, "$is_available"
+                ]},
+                "sold_out": {"$cond": [{"$gt": ["$stock", 0]}, False, "$sold_out"]}
+            }}
+        ]
+    )
+
+
+def reserve_stock(canteen_id, quantities, session=None):
+    """
+    Reserve stock for every line of an order, all or nothing
+    quantities: dict of item id -> total quantity
+    Each line is a conditional update of an existing item - a line that matches
+    nothing (sold out, unavailable or deleted) never writes anything.
+    Returns: dict of item id -> current price, read from the primary with the reservation
+    Raises OutOfStockError after rolling back the lines that were already reserved
+    """
+    reserved = {}
+    prices = {}
+    try:
+        for item_id, quantity in quantities.items():
+            item = db.menu_items.find_one_and_update(
+                _reserve_filter(canteen_id, item_id, quantity),
+                _reserve_update(quantity),
+                projection={"price": 1},
+                session=session
+            )
+            if item is None:
+                raise OutOfStockError(item_id)
+            reserved[item_id] = quantity
+            prices[item_id] = item['price']
+    except Exception:
+        release_stock(canteen_id, reserved, session=session)
+        raise
+    finally:
+        invalidate_stock(canteen_id)
+    return prices
+
+
+def release_stock(canteen_id, quantities, session=None):
+    """Give back reserved stock, e.g. when the order could not be saved"""
+    if quantities:
+        db.menu_items.bulk_write(
+            [_release_op(canteen_id, item_id, quantity) for item_id, quantity in quantities.items()],
+            ordered=False,
+            session=session
+        )
+    invalidate_stock(canteen_id)
+
+
+def invalidate_stock(canteen_id):
+    """Drop cached stock levels after stock changed"""
+    stock_cache.invalidate(canteen_id)
+
+
+def _load_stock(canteen_id):
+    cursor = db.menu_items.find(
+        {"canteen_id": canteen_id, "stock": {"$type": "number"}},
+        {"stock": 1, "is_available": 1}
+    )
+    return {str(item['_id']): (item['stock'], item['is_available']) for item in cursor}
+
+
+def get_stock_levels(canteen_id):
+    """
+    Get current stock of all stock-tracked items of a canteen (cached briefly)
+    Returns: dict of item id -> (stock, is_available)
+    """
+    return stock_cache.get_or_load(canteen_id, lambda: _load_stock(canteen_id))
+
+
+def with_stock(items, canteen_id):
+    """
+    Overlay live stock levels on cached menu items
+    Only stock-tracked items are copied - the shared cached dicts are never modified
+    """
+    levels = get_stock_levels(canteen_id)
+    if not levels:
+        return items
+    merged = []
+    for item in items:
+        level = levels.get(item['_id'])
+        if level is not None:
+            item = dict(item, stock=level[0], is_available=level[1])
+        merged.append(item)
+    return merged
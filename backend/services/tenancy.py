@@ -0,0 +1,71 @@
+# Canteen Tenancy
+# Resolves the canteen (tenant) for each request and loads per-canteen settings
+
+import re
+from flask import g, request, jsonify
+from flask_jwt_extended import get_jwt
+from extensions import db
+from config import Config
+from services.cache import TTLCache
+
+CANTEEN_HEADER = 'X-Canteen-ID'
+CANTEEN_ID_PATTERN = re.compile(r'^[a-z0-9_-]{1,32}$')
+
+canteen_cache = TTLCache(ttl=Config.CANTEEN_CACHE_TTL)
+
+
+def _load_canteen(canteen_id):
+    canteen = db.canteens.find_one({"_id": canteen_id})
+    if canteen is None and canteen_id != Config.DEFAULT_CANTEEN_ID:
+        return None
+
+    # Fall back to the global settings for anything the canteen doesn't override
+    settings = {
+        "id": canteen_id,
+        "name": "Canteen",
+        "upi_id": Config.UPI_ID,
+        "upi_name": Config.UPI_NAME,
+        "qr_base_url": Config.QR_BASE_URL
+    }
+    for key in ('name', 'upi_id', 'upi_name', 'qr_base_url'):
+        if canteen and canteen.get(key):
+            settings[key] = canteen[key]
+    return settings
+
+
+def get_canteen(canteen_id):
+    """
+    Get settings for a canteen (cached)
+    Returns None if the canteen is not registered
+    """
+    return canteen_cache.get_or_load(canteen_id, lambda: _load_canteen(canteen_id))
+
+
+def resolve_canteen():
+    """
+    before_request hook
+    Reads the canteen from the X-Canteen-ID header or ?canteen= query parameter,
+    falling back to the default canteen
+    """
+    canteen_id = request.headers.get(CANTEEN_HEADER) or request.args.get('canteen') or Config.DEFAULT_CANTEEN_ID
+
+    if not CANTEEN_ID_PATTERN.match(canteen_id):
+        return jsonify({"error": "Invalid canteen id"}), 400
+
+    if get_canteen(canteen_id) is None:
+        return jsonify({"error": "Canteen not found"}), 404
+
+    g.canteen_id = canteen_id
+
+
+def get_canteen_id():
+    """
+    Get the canteen for the current request
+    Staff tokens are scoped to one canteen, so their claim wins over the header
+    """
+    try:
+        claim = get_jwt().get('canteen_id')
+    except RuntimeError:
+        # No JWT verified for this request
+        claim = None
+    return claim or g.get('canteen_id', Config.DEFAULT_CANTEEN_ID)
@@ -1,10 +1,10 @@
 // Staff Dashboard Component
 // Staff panel for managing menu items and viewing orders
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../../context/AuthContext';
-import { menuAPI, orderAPI, qrAPI } from '../../utils/api';
+import { menuAPI, orderAPI, qrAPI, dashboardAPI } from '../../utils/api';
 import './Staff.css';
 
 const StaffDashboard = () => {
@@ -14,7 +14,13 @@ const StaffDashboard = () => {
     const [activeTab, setActiveTab] = useState('menu'); // menu, orders, qr
     const [menuItems, setMenuItems] = useState([]);
     const [orders, setOrders] = useState([]);
+    const [summary, setSummary] = useState(null);
+    const [orderView, setOrderView] = useState('active'); // active, all
+    const [allOrders, setAllOrders] = useState([]);
+    const historyWatermarkRef = useRef(null); // Order history polls only fetch orders changed after this
     const [loading, setLoading] = useState(false);
+    // Section versions of the last bootstrap response, so only changed sections are sent again
+    const versionsRef = useRef({});
     const [error, setError] = useState('');
 
     // Menu form state
@@ -40,32 +46,54 @@ const StaffDashboard = () => {
         }
     }, [isStaff, navigate]);
 
-    // Fetch data based on active tab
+    // Refresh the dashboard when switching tabs (cheap - unchanged sections are not sent)
     useEffect(() => {
-        if (activeTab === 'menu') {
-            fetchMenuItems();
-        } else if (activeTab === 'orders') {
-            fetchOrders();
+        if (activeTab !== 'qr') {
+            fetchDashboard();
         }
     }, [activeTab]);
 
-    const fetchMenuItems = async () => {
+    // Menu, active orders and summary in one request
+    const fetchDashboard = async () => {
         try {
-            setLoading(true);
-            const response = await menuAPI.getAllItems();
-            setMenuItems(response.data.items);
+            setLoading(Object.keys(versionsRef.current).length === 0);
+            const response = await dashboardAPI.bootstrap(versionsRef.current);
+            const { versions, menu, orders: activeOrders, summary: counts } = response.data;
+            if (menu) setMenuItems(menu);
+            if (activeOrders) setOrders(activeOrders);
+            if (counts) setSummary(counts);
+            versionsRef.current = versions;
+            setError('');
         } catch (err) {
-            setError('Failed to fetch menu items');
+            setError('Failed to load dashboard');
         } finally {
             setLoading(false);
         }
     };
 
-    const fetchOrders = async () => {
+    // Apply a delta: drop removed orders, replace changed ones, add new ones
+    const mergeOrders = (current, changed, tombstones) => {
+        const byId = new Map(current.map((order) => [order._id, order]));
+        tombstones.forEach((id) => byId.delete(id));
+        changed.forEach((order) => byId.set(order._id, order));
+        return [...byId.values()].sort((a, b) => b.created_at.localeCompare(a.created_at));
+    };
+
+    // Every order including delivered ones, kept up to date with delta sync
+    const fetchOrderHistory = async () => {
         try {
-            setLoading(true);
-            const response = await orderAPI.getOrders();
-            setOrders(response.data.orders);
+            setLoading(!historyWatermarkRef.current);
+            const response = await orderAPI.getOrders(historyWatermarkRef.current);
+            const { orders: changed, tombstones, watermark } = response.data;
+            if (historyWatermarkRef.current) {
+                setAllOrders((current) => mergeOrders(current, changed, tombstones));
+            } else {
+                setAllOrders(changed);
+            }
+            if (watermark) {
+                historyWatermarkRef.current = watermark;
+            }
+            setError('');
         } catch (err) {
             setError('Failed to fetch orders');
         } finally {
@@ -73,6 +101,12 @@ const StaffDashboard = () => {
         }
     };
 
+    useEffect(() => {
+        if (activeTab === 'orders' && orderView === 'all') {
+            fetchOrderHistory();
+        }
+    }, [activeTab, orderView]);
+
     const handleLogout = () => {
         logout();
         navigate('/staff-login');
@@ -126,7 +160,7 @@ const StaffDashboard = () => {
                 alert('Menu item added successfully!');
             }
             setShowMenuForm(false);
-            fetchMenuItems();
+            fetchDashboard();
         } catch (err) {
             alert(err.response?.data?.error || 'Operation failed');
         }
@@ -137,7 +171,7 @@ const StaffDashboard = () => {
             try {
                 await menuAPI.deleteItem(id);
                 alert('Menu item deleted successfully!');
-                fetchMenuItems();
+                fetchDashboard();
             } catch (err) {
                 alert(err.response?.data?.error || 'Delete failed');
             }
@@ -149,7 +183,10 @@ const StaffDashboard = () => {
         try {
             await orderAPI.updateOrderStatus(orderId, newStatus);
             alert('Order status updated!');
-            fetchOrders();
+            fetchDashboard();
+            if (orderView === 'all') {
+                fetchOrderHistory();
+            }
         } catch (err) {
             alert(err.response?.data?.error || 'Update failed');
         }
@@ -278,14 +315,34 @@ const StaffDashboard = () => {
                 {/* Orders Tab */}
                 {activeTab === 'orders' && (
                     <div className="orders-management">
-                        <h2>All Orders</h2>
+                        <h2>{orderView === 'active' ? 'Active Orders' : 'All Orders'}</h2>
+                        <div className="orders-view">
+                            <button
+                                className={`view-btn ${orderView === 'active' ? 'active' : ''}`}
+                                onClick={() => setOrderView('active')}
+                            >
+                                Active
+                            </button>
+                            <button
+                                className={`view-btn ${orderView === 'all' ? 'active' : ''}`}
+                                onClick={() => setOrderView('all')}
+                            >
+                                All (incl. delivered)
+                            </button>
+                        </div>
+                        {summary && (
+                            <p className="orders-summary">
+                                Today: {summary.orders_today} orders · ₹{summary.revenue_today.toFixed(2)} paid ·{' '}
+                                {summary.pending_payments} payments pending · {summary.sold_out} items sold out
+                            </p>
+                        )}
                         {loading ? (
                             <div className="loading"><div className="spinner"></div></div>
-                        ) : orders.length === 0 ? (
-                            <p className="empty-message">No orders yet</p>
+                        ) : (orderView === 'active' ? orders : allOrders).length === 0 ? (
+                            <p className="empty-message">{orderView === 'active' ? 'No active orders' : 'No orders yet'}</p>
                         ) : (
                             <div className="orders-list">
-                                {orders.map(order => (
+                                {(orderView === 'active' ? orders : allOrders).map(order => (
                                     <div key={order._id} className="order-card">
                                         <div className="order-header">
                                             <h3>Order #{order._id.slice(-6)}</h3>
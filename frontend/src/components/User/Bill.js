@@ -3,6 +3,7 @@
 
 import React, { useRef } from 'react';
 import { useNavigate, useLocation } from 'react-router-dom';
+import { receiptAPI } from '../../utils/api';
 import './User.css';
 
 const Bill = () => {
@@ -24,7 +25,23 @@ const Bill = () => {
         customerPhone = ''
     } = billData;
 
-    const handleDownloadBill = () => {
+    const handleDownloadBill = async () => {
+        // Prefer the server-rendered receipt, which is cached per order version
+        if (orderId !== 'N/A') {
+            try {
+                const response = await receiptAPI.getOrderReceipt(orderId, 'pdf');
+                const url = URL.createObjectURL(response.data);
+                const link = document.createElement('a');
+                link.href = url;
+                link.download = `bill_${orderId.slice(-6)}.pdf`;
+                link.click();
+                URL.revokeObjectURL(url);
+                return;
+            } catch (error) {
+                console.error('Server receipt unavailable, printing locally:', error);
+            }
+        }
+
         const printContent = billRef.current;
         const originalContents = document.body.innerHTML;
 
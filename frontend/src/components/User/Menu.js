@@ -37,7 +37,8 @@ const Menu = () => {
     const fetchMenuItems = async () => {
         try {
             setLoading(true);
-            const response = await menuAPI.getAllItems();
+            // Most ordered in the last hour first
+            const response = await menuAPI.getAllItems({ sort: 'popular' });
             setMenuItems(response.data.items);
         } catch (err) {
             setError('Failed to load menu items');
@@ -1,7 +1,7 @@
 // My Orders Component
 // Shows user's order history and real-time status tracking
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../../context/AuthContext';
 import { orderAPI } from '../../utils/api';
@@ -14,6 +14,7 @@ const MyOrders = () => {
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
     const [filter, setFilter] = useState('all'); // all, pending, completed
+    const watermarkRef = useRef(null); // Polls only fetch orders changed after this
 
     useEffect(() => {
         fetchOrders();
@@ -23,10 +24,26 @@ const MyOrders = () => {
         return () => clearInterval(interval);
     }, []);
 
+    // Apply a delta: drop removed orders, replace changed ones, add new ones
+    const mergeOrders = (current, changed, tombstones) => {
+        const byId = new Map(current.map((order) => [order._id, order]));
+        tombstones.forEach((id) => byId.delete(id));
+        changed.forEach((order) => byId.set(order._id, order));
+        return [...byId.values()].sort((a, b) => b.created_at.localeCompare(a.created_at));
+    };
+
     const fetchOrders = async () => {
         try {
-            const response = await orderAPI.getOrders();
-            setOrders(response.data.orders);
+            const response = await orderAPI.getOrders(watermarkRef.current);
+            const { orders: changed, tombstones, watermark } = response.data;
+            if (watermarkRef.current) {
+                setOrders((current) => mergeOrders(current, changed, tombstones));
+            } else {
+                setOrders(changed);
+            }
+            if (watermark) {
+                watermarkRef.current = watermark;
+            }
             setError('');
         } catch (err) {
             setError('Failed to fetch orders');
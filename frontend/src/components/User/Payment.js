@@ -25,6 +25,9 @@ const Payment = () => {
     const [qrCodeGenerated, setQrCodeGenerated] = useState(false);
 
     useEffect(() => {
+        // Estimate only - once the order exists its server total is shown
+        if (orderId) return;
+
         // Get split info from navigation state
         const state = location.state;
         if (state) {
@@ -42,7 +45,7 @@ const Payment = () => {
 
     // Generate UPI link and create order
     useEffect(() => {
-        if (cart.length > 0 && totalAmount > 0) {
+        if (cart.length > 0 && totalAmount > 0 && !orderId) {
             createOrderAndGenerateUPI();
         }
     }, [totalAmount]);
@@ -104,11 +107,9 @@ const Payment = () => {
         try {
             setLoading(true);
 
-            // Prepare order items
+            // Prepare order items - names and prices come from the menu on the server
             const orderItems = cart.map(item => ({
                 item_id: item._id,
-                name: item.name,
-                price: item.price,
                 quantity: item.quantity
             }));
 
@@ -123,9 +124,14 @@ const Payment = () => {
             const newOrderId = orderResponse.data.order_id;
             setOrderId(newOrderId);
 
+            // Charge the server's total (menu prices plus tax), not our estimate
+            const { total_amount: chargedTotal, per_person_amount: chargedPerPerson } = orderResponse.data.order;
+            setTotalAmount(chargedTotal);
+            setPerPersonAmount(chargedPerPerson.toFixed(2));
+
             // Generate UPI link
             const upiResponse = await paymentAPI.generateUPI({
-                amount: totalAmount,
+                amount: chargedTotal,
                 order_id: newOrderId,
                 customer_name: user?.name || 'Customer'
             });
@@ -14,13 +14,32 @@ const api = axios.create({
     },
 });
 
-// Add token to requests if available
+// Canteen (tenant) comes from the table QR code URL (?canteen=...) and is remembered
+const getCanteenId = () => {
+    const fromUrl = new URLSearchParams(window.location.search).get('canteen');
+    if (fromUrl) {
+        localStorage.setItem('canteen', fromUrl);
+        return fromUrl;
+    }
+    return localStorage.getItem('canteen') || process.env.REACT_APP_CANTEEN_ID;
+};
+
+// Add token and canteen to requests if available
 api.interceptors.request.use(
     (config) => {
         const token = localStorage.getItem('token');
         if (token) {
             config.headers.Authorization = `Bearer ${token}`;
         }
+        const canteenId = getCanteenId();
+        if (canteenId) {
+            config.headers['X-Canteen-ID'] = canteenId;
+        }
+        // Lets the backend serve our reads from replicas without missing our own writes
+        const causalToken = localStorage.getItem('causalToken');
+        if (causalToken) {
+            config.headers['X-Causal-Token'] = causalToken;
+        }
         return config;
     },
     (error) => {
@@ -28,9 +47,15 @@ api.interceptors.request.use(
     }
 );
 
-// Handle response errors
+// Remember the causal token of our latest write, handle response errors
 api.interceptors.response.use(
-    (response) => response,
+    (response) => {
+        const causalToken = response.headers['x-causal-token'];
+        if (causalToken) {
+            localStorage.setItem('causalToken', causalToken);
+        }
+        return response;
+    },
     (error) => {
         if (error.response?.status === 401) {
             // Token expired or invalid
@@ -52,7 +77,8 @@ export const authAPI = {
 
 // Menu APIs
 export const menuAPI = {
-    getAllItems: () => api.get('/menu/items'),
+    getAllItems: (params = {}) => api.get('/menu/items', { params }),
+    getPopular: (window = 'hour', limit = 10) => api.get('/menu/popular', { params: { window, limit } }),
     getItem: (id) => api.get(`/menu/items/${id}`),
     addItem: (data) => api.post('/menu/items', data),
     updateItem: (id, data) => api.put(`/menu/items/${id}`, data),
@@ -63,10 +89,19 @@ export const menuAPI = {
 // Order APIs
 export const orderAPI = {
     createOrder: (data) => api.post('/orders/', data),
-    getOrders: () => api.get('/orders/'),
+    getOrders: (since) => api.get('/orders/', { params: since ? { since } : {} }),
     getOrder: (id) => api.get(`/orders/${id}`),
     updatePaymentStatus: (id, status) => api.put(`/orders/${id}/payment`, { payment_status: status }),
     updateOrderStatus: (id, status) => api.put(`/orders/${id}/status`, { order_status: status }),
+    deleteOrder: (id) => api.delete(`/orders/${id}`),
+};
+
+// Staff Dashboard APIs
+export const dashboardAPI = {
+    // versions: { section: version } from the previous response - unchanged sections are left out
+    bootstrap: (versions = {}) => api.get('/dashboard/bootstrap', {
+        params: { versions: Object.entries(versions).map(([section, version]) => `${section}:${version}`).join(',') }
+    }),
 };
 
 // Payment APIs
@@ -75,6 +110,13 @@ export const paymentAPI = {
     verifyPayment: (data) => api.post('/payment/verify', data),
 };
 
+// Receipt APIs (rendered and cached by the backend)
+export const receiptAPI = {
+    getOrderReceipt: (id, format = 'pdf') => api.get(`/receipts/orders/${id}`, { params: { format }, responseType: 'blob' }),
+    getTableReceipt: (table, format = 'pdf') => api.get(`/receipts/tables/${table}`, { params: { format }, responseType: 'blob' }),
+    getDailyReceipts: (date, format = 'pdf') => api.get('/receipts/daily', { params: { date, format }, responseType: 'blob' }),
+};
+
 // QR Code APIs
 export const qrAPI = {
     generateQR: (data) => api.post('/qr/generate', data),